@@ -7,9 +7,9 @@ echo.
 
 cd /d "%~dp0"
 
-python --version >nul 2>&1
+python -c "import sys; sys.exit(sys.version_info < (3, 10))" >nul 2>&1
 if errorlevel 1 (
-    echo [ERROR] Python not found. Please install Python 3.8+
+    echo [ERROR] Python 3.10+ not found. Please install Python 3.10+
     pause
     exit /b 1
 )
@@ -8,9 +8,11 @@ Set-Location $PSScriptRoot
 
 try {
     $pythonVersion = python --version 2>&1
+    python -c "import sys; sys.exit(sys.version_info < (3, 10))"
+    if ($LASTEXITCODE -ne 0) { throw "Python 3.10+ required" }
     Write-Host "✓ Python: $pythonVersion" -ForegroundColor Green
 } catch {
-    Write-Host "✗ Python not found. Install Python 3.8+" -ForegroundColor Red
+    Write-Host "✗ Python 3.10+ not found. Install Python 3.10+" -ForegroundColor Red
     exit 1
 }
 
@@ -6,13 +6,13 @@ echo ==================================
 echo.
 
 echo Checking Python installation...
-python --version >nul 2>&1
+python -c "import sys; sys.exit(sys.version_info < (3, 10))" >nul 2>&1
 if errorlevel 1 (
-    echo [ERROR] Python not found. Please install Python 3.8 or higher.
+    echo [ERROR] Python 3.10 or higher not found. Please install Python 3.10 or higher.
     pause
     exit /b 1
 )
-echo [OK] Python found
+echo [OK] Python 3.10+ found
 echo.
 
 echo Checking .env file...
@@ -6,9 +6,11 @@ Write-Host ""
 Write-Host "Checking Python installation..." -ForegroundColor Yellow
 try {
     $pythonVersion = python --version 2>&1
+    python -c "import sys; sys.exit(sys.version_info < (3, 10))"
+    if ($LASTEXITCODE -ne 0) { throw "Python 3.10+ required" }
     Write-Host "✓ Found: $pythonVersion" -ForegroundColor Green
 } catch {
-    Write-Host "✗ Python not found. Please install Python 3.8 or higher." -ForegroundColor Red
+    Write-Host "✗ Python 3.10 or higher not found. Please install Python 3.10 or higher." -ForegroundColor Red
     exit 1
 }
 
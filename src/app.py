@@ -5,14 +5,25 @@ Advanced AI-Powered Email Decision Layer
 
 import streamlit as st
 import asyncio
+import json
+import os.path
+import queue
+import threading
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, List
+from typing import TYPE_CHECKING, Callable, Dict, List
 
 from config import Config
-from gmail_fetcher import GmailFetcher
-from email_intelligence import EmailIntelligence
 from csv_exporter import CSVExporter
-from advanced_features import EmailPatternAnalyzer, SmartCategorizer, EmailInsightGenerator
+from advanced_features import EmailPatternAnalyzer, EmailInsightGenerator
+
+# The Gmail and AI clients pull in heavy optional libraries, so they are
+# imported where first used and the page header renders without waiting on them
+if TYPE_CHECKING:
+    from email_intelligence import EmailIntelligence, ProcessedEmail
 
 
 # Page configuration
@@ -74,6 +85,28 @@ st.markdown("""
         text-align: center;
         box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
     }
+    .metrics-row {
+        display: flex;
+        gap: 1rem;
+        margin-bottom: 1rem;
+    }
+    .metrics-row .metric-card {
+        flex: 1;
+        padding: 20px 10px;
+    }
+    .metric-label {
+        font-size: 0.9rem;
+        opacity: 0.85;
+    }
+    .metric-value {
+        font-size: 1.6rem;
+        font-weight: 700;
+        margin-top: 5px;
+    }
+    .metric-delta {
+        font-size: 0.85rem;
+        margin-top: 5px;
+    }
     .insight-card {
         background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
         color: white;
@@ -125,33 +158,163 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Shared clients (built once per server process, survive reruns and sessions).
+# The Gmail fetcher is not among them: its httplib2 service and message cache
+# are not thread-safe, so each session builds its own in load_emails.
+@st.cache_resource(show_spinner=False)
+def get_intelligence() -> 'EmailIntelligence':
+    """Shared email intelligence engine"""
+    from email_intelligence import EmailIntelligence
+    return EmailIntelligence()
+
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived event loop running on a daemon thread"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def get_process_pool() -> ProcessPoolExecutor:
+    """Worker processes for analyzing large inboxes (spawned, since the server is threaded)"""
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+
+
+def new_analytics() -> Dict:
+    """Empty aggregates for the advanced analytics view"""
+    return {
+        'formality_sum': 0,
+        'emotion': Counter(),
+        'category': Counter(),
+        'relationship': Counter(),
+        'date_count': 0,
+        'date_samples': [],
+        'amount_count': 0,
+        'amount_samples': [],
+        'actions': Counter(),
+        'urgent_count': 0,
+        'high_priority_count': 0,
+        'response_hours_sum': 0
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def bootstrap() -> bool:
+    """Validate configuration once per server process"""
+    Config.validate()
+    return True
+
+
 # Initialize session state
 def init_session_state():
     """Initialize Streamlit session state variables"""
+    if '_initialized' in st.session_state:
+        return
+    
     if 'emails' not in st.session_state:
         st.session_state.emails = []
     if 'processed_emails' not in st.session_state:
-        st.session_state.processed_emails = {}
+        st.session_state.processed_emails = load_processed_cache()
+    if 'processed_emails_list' not in st.session_state:
+        st.session_state.processed_emails_list = list(st.session_state.processed_emails.values())
     if 'selected_email_id' not in st.session_state:
         st.session_state.selected_email_id = None
     if 'filter_urgency' not in st.session_state:
         st.session_state.filter_urgency = 'All'
     if 'filter_intent' not in st.session_state:
         st.session_state.filter_intent = 'All'
+    if 'emails_version' not in st.session_state:
+        st.session_state.emails_version = 0
+    if 'filter_cache' not in st.session_state:
+        st.session_state.filter_cache = None
     if 'fetcher' not in st.session_state:
         st.session_state.fetcher = None
     if 'intelligence' not in st.session_state:
         st.session_state.intelligence = None
     if 'processing_status' not in st.session_state:
-        st.session_state.processing_status = {}
+        st.session_state.processing_status = {
+            email_id: 'processed' for email_id in st.session_state.processed_emails
+        }
     if 'view_mode' not in st.session_state:
         st.session_state.view_mode = 'cards'
     if 'show_advanced' not in st.session_state:
         st.session_state.show_advanced = True
     if 'email_patterns' not in st.session_state:
         st.session_state.email_patterns = {}
+    if 'analytics' not in st.session_state:
+        st.session_state.analytics = new_analytics()
     if 'executive_summary' not in st.session_state:
         st.session_state.executive_summary = None
+    
+    # Rebuild insights for emails restored from a previous session
+    if st.session_state.processed_emails and not st.session_state.email_patterns:
+        generate_advanced_insights()
+    
+    st.session_state._initialized = True
+
+
+# ProcessedEmail fields stored as ISO strings in the JSON cache
+_CACHE_DATETIME_FIELDS = ('timestamp', 'processed_at')
+
+
+def load_processed_cache() -> Dict:
+    """Load processed emails saved by a previous session"""
+    from email_intelligence import ProcessedEmail
+    
+    path = Config.PROCESSED_CACHE_PATH
+    if not path or not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as cache_file:
+            records = json.load(cache_file)
+        
+        processed = {}
+        for email_id, record in records.items():
+            for key in _CACHE_DATETIME_FIELDS:
+                if record.get(key):
+                    record[key] = datetime.fromisoformat(record[key])
+            processed[email_id] = ProcessedEmail(**record)
+        return processed
+    except Exception as e:
+        print(f"Could not load processed email cache: {e}")
+        return {}
+
+
+def save_processed_cache():
+    """Save processed emails so later sessions skip re-processing them"""
+    path = Config.PROCESSED_CACHE_PATH
+    if not path:
+        return
+    
+    records = {}
+    for email_id, email in st.session_state.processed_emails.items():
+        record = asdict(email)
+        for key in _CACHE_DATETIME_FIELDS:
+            if record[key] is not None:
+                record[key] = record[key].isoformat()
+        records[email_id] = record
+    
+    try:
+        with open(path, 'w', encoding='utf-8') as cache_file:
+            json.dump(records, cache_file)
+    except Exception as e:
+        print(f"Could not save processed email cache: {e}")
+
+
+def evict_unfetched_emails() -> bool:
+    """Drop processed emails that are no longer in the current fetch"""
+    fetched_ids = {email['id'] for email in st.session_state.emails}
+    stale_ids = [email_id for email_id in st.session_state.processed_emails if email_id not in fetched_ids]
+    for email_id in stale_ids:
+        del st.session_state.processed_emails[email_id]
+        st.session_state.processing_status.pop(email_id, None)
+        st.session_state.email_patterns.pop(email_id, None)
+    if st.session_state.selected_email_id in stale_ids:
+        st.session_state.selected_email_id = None
+    return bool(stale_ids)
 
 
 def load_emails():
@@ -159,6 +322,7 @@ def load_emails():
     try:
         with st.spinner('Fetching emails...'):
             if st.session_state.fetcher is None:
+                from gmail_fetcher import GmailFetcher
                 st.session_state.fetcher = GmailFetcher()
             
             emails = st.session_state.fetcher.fetch_emails(
@@ -177,64 +341,135 @@ def load_emails():
         return []
 
 
-async def process_emails_async(emails: List[Dict]):
-    """Process emails with AI intelligence"""
-    if st.session_state.intelligence is None:
-        st.session_state.intelligence = EmailIntelligence()
-    
-    results = await st.session_state.intelligence.process_batch(emails)
-    
-    # Combine email data with processing results
-    for email, result in zip(emails, results):
-        email_id = email['id']
-        st.session_state.processed_emails[email_id] = {
-            'email_id': email_id,
-            'sender': email['sender'],
-            'sender_name': email['sender_name'],
-            'subject': email['subject'],
-            'body': email['body'],
-            'snippet': email.get('snippet', ''),
-            'timestamp': email['timestamp'],
-            'labels': email.get('labels', []),
-            'summary': result['summary'],
-            'intent': result['intent'],
-            'urgency': result['urgency'],
-            'sentiment': result['sentiment'],
-            'suggested_replies': result['suggested_replies'],
-            'selected_action': None,
-            'drafted_reply': '',
-            'processed_at': datetime.now()
-        }
-        st.session_state.processing_status[email_id] = 'processed'
+async def process_emails_async(
+    intelligence: 'EmailIntelligence',
+    emails: List[Dict],
+    on_result: Callable[[int, Dict], None]
+) -> List[Dict]:
+    """Process emails with AI intelligence, reporting each result as it completes"""
+    return await intelligence.process_batch(emails, on_result=on_result)
+
+
+def store_processed_email(email: Dict, result: Dict, processed_at: datetime):
+    """Combine email data with its processing result"""
+    from email_intelligence import ProcessedEmail
+    
+    email_id = email['id']
+    st.session_state.processed_emails[email_id] = ProcessedEmail(
+        email_id=email_id,
+        sender=email['sender'],
+        sender_name=email['sender_name'],
+        subject=email['subject'],
+        body=email['body'],
+        snippet=email.get('snippet', ''),
+        timestamp=email['timestamp'],
+        timestamp_str=email['timestamp'].strftime('%b %d, %H:%M'),
+        labels=email.get('labels', []),
+        summary=result['summary'],
+        intent=result['intent'],
+        urgency=result['urgency'],
+        sentiment=result['sentiment'],
+        suggested_replies=result['suggested_replies'],
+        processed_at=processed_at
+    )
+    st.session_state.processing_status[email_id] = 'processed'
+
+
+def refresh_processed_views():
+    """Refresh the shared list view (same records) and invalidate memoized views"""
+    st.session_state.processed_emails_list = list(st.session_state.processed_emails.values())
+    st.session_state.emails_version += 1
 
 
 def process_emails():
     """Wrapper to run async email processing"""
     try:
         with st.spinner('Processing emails with AI...'):
-            asyncio.run(process_emails_async(st.session_state.emails))
+            if st.session_state.intelligence is None:
+                st.session_state.intelligence = get_intelligence()
+            
+            # Results for emails outside the current fetch are dropped so the
+            # saved cache stays the size of one inbox fetch
+            evicted = evict_unfetched_emails()
+            
+            # Emails processed earlier (this session or a saved one) are not re-sent
+            emails = [
+                email for email in st.session_state.emails
+                if email['id'] not in st.session_state.processed_emails
+            ]
+            
+            if emails:
+                # The background loop only runs the AI requests and queues each
+                # result; session state is updated here on the script thread
+                completed = queue.Queue()
+                future = asyncio.run_coroutine_threadsafe(
+                    process_emails_async(
+                        st.session_state.intelligence,
+                        emails,
+                        lambda i, result: completed.put((i, result))
+                    ),
+                    get_event_loop()
+                )
+                
+                # One processing time for the whole batch
+                processed_at = datetime.now()
+                progress = st.progress(0.0, text=f'Processed 0/{len(emails)} emails')
+                done = 0
+                try:
+                    while done < len(emails):
+                        try:
+                            i, result = completed.get(timeout=0.1)
+                        except queue.Empty:
+                            if future.done() and completed.empty():
+                                future.result()
+                                break
+                            continue
+                        
+                        store_processed_email(emails[i], result, processed_at)
+                        done += 1
+                        progress.progress(done / len(emails), text=f'Processed {done}/{len(emails)} emails')
+                    future.result()
+                finally:
+                    # Keep whatever finished, even if the batch failed part way
+                    progress.empty()
+                    refresh_processed_views()
+                    save_processed_cache()
+            elif evicted:
+                refresh_processed_views()
+                save_processed_cache()
         st.success('Email processing complete!')
     except Exception as e:
         st.error(f'Error processing emails: {str(e)}')
 
 
-def filter_emails(emails: List[Dict]) -> List[Dict]:
+def filter_emails(emails: Dict[str, 'ProcessedEmail']) -> List['ProcessedEmail']:
     """Filter emails based on selected criteria"""
+    # Reuse the last result when neither the emails nor the filters changed
+    cache_key = (
+        st.session_state.emails_version,
+        st.session_state.filter_urgency,
+        st.session_state.filter_intent
+    )
+    cached = st.session_state.filter_cache
+    if cached and cached[0] == cache_key:
+        return [emails[email_id] for email_id in cached[1] if email_id in emails]
+    
     filtered = []
     
     for email_id, email_data in emails.items():
         # Filter by urgency
         if st.session_state.filter_urgency != 'All':
-            if email_data.get('urgency') != st.session_state.filter_urgency:
+            if email_data.urgency != st.session_state.filter_urgency:
                 continue
         
         # Filter by intent
         if st.session_state.filter_intent != 'All':
-            if email_data.get('intent') != st.session_state.filter_intent:
+            if email_data.intent != st.session_state.filter_intent:
                 continue
         
         filtered.append(email_data)
     
+    st.session_state.filter_cache = (cache_key, [email.email_id for email in filtered])
     return filtered
 
 
@@ -245,7 +480,7 @@ def display_statistics():
         return
     
     stats = CSVExporter.generate_statistics(
-        list(st.session_state.processed_emails.values())
+        st.session_state.processed_emails_list
     )
     
     st.subheader('📊 Email Statistics')
@@ -313,29 +548,43 @@ def display_email_list():
     
     st.sidebar.write(f'**{len(filtered_emails)} emails**')
     
-    # Display email list
-    for email in filtered_emails:
-        urgency_class = f"urgency-{email['urgency'].lower()}"
-        
-        # Email card
-        with st.sidebar.container():
-            col1, col2 = st.sidebar.columns([3, 1])
-            
-            with col1:
-                if st.sidebar.button(
-                    f"📧 {email['sender_name'][:20]}",
-                    key=f"email_{email['email_id']}",
-                    use_container_width=True
-                ):
-                    st.session_state.selected_email_id = email['email_id']
-                    st.rerun()
-            
-            with col2:
-                urgency_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
-                st.sidebar.write(urgency_emoji.get(email['urgency'], '⚪'))
-            
-            st.sidebar.caption(email['subject'][:40] + ('...' if len(email['subject']) > 40 else ''))
-            st.sidebar.divider()
+    # Display email list as one table widget instead of a button, caption
+    # and divider per email; selecting a row opens the email
+    urgency_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
+    st.session_state.inbox_ids = [email.email_id for email in filtered_emails]
+    st.sidebar.dataframe(
+        {
+            ' ': [urgency_emoji.get(email.urgency, '⚪') for email in filtered_emails],
+            'Sender': [email.sender_name[:20] for email in filtered_emails],
+            'Subject': [
+                email.subject[:40] + ('...' if len(email.subject) > 40 else '')
+                for email in filtered_emails
+            ]
+        },
+        key='inbox_table',
+        on_select=select_inbox_row,
+        selection_mode='single-row',
+        hide_index=True
+    )
+
+
+def select_inbox_row():
+    """Open the email picked in the inbox table"""
+    rows = st.session_state.inbox_table.selection.rows
+    if rows and rows[0] < len(st.session_state.inbox_ids):
+        st.session_state.selected_email_id = st.session_state.inbox_ids[rows[0]]
+
+
+# Button callbacks run before the rerun, so the new state renders without a second rerun
+def clear_custom_reply(email_id: str):
+    """Reset the custom reply text area"""
+    st.session_state[f"custom_{email_id}"] = ''
+
+
+def discard_reply(email: 'ProcessedEmail'):
+    """Drop the drafted reply for an email"""
+    email.selected_action = None
+    email.drafted_reply = ''
 
 
 def display_email_details():
@@ -359,10 +608,10 @@ def display_email_details():
     patterns = st.session_state.email_patterns.get(st.session_state.selected_email_id, {})
     
     # Email header with enhanced styling
-    urgency_class = f"urgency-{email['urgency'].lower()}"
+    urgency_class = f"urgency-{email.urgency.lower()}"
     st.markdown(f"""
     <div class="email-card {urgency_class}">
-        <h2>📧 {email['subject']}</h2>
+        <h2>📧 {email.subject}</h2>
     </div>
     """, unsafe_allow_html=True)
     
@@ -370,18 +619,18 @@ def display_email_details():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.write(f"**From:** {email['sender_name']}")
+        st.write(f"**From:** {email.sender_name}")
         if patterns and 'relationship' in patterns:
             st.caption(patterns['relationship'])
     
     with col2:
-        st.write(f"**Date:** {email['timestamp'].strftime('%b %d, %H:%M')}")
+        st.write(f"**Date:** {email.timestamp_str}")
         if patterns and 'pattern' in patterns:
             st.caption(f"📖 {patterns['pattern']['estimated_read_time']}")
     
     with col3:
         urgency_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
-        st.write(f"**Priority:** {urgency_emoji[email['urgency']]} {email['urgency']}")
+        st.write(f"**Priority:** {urgency_emoji[email.urgency]} {email.urgency}")
         if patterns and 'response_prediction' in patterns:
             pred = patterns['response_prediction']
             st.caption(f"⏱️ {pred['recommended_response_hours']:.0f}hr deadline")
@@ -389,7 +638,7 @@ def display_email_details():
     with col4:
         if patterns and 'category' in patterns:
             st.write(f"**Category:** {patterns['category']}")
-        st.write(f"**Intent:** `{email['intent']}`")
+        st.write(f"**Intent:** `{email.intent}`")
     
     st.divider()
     
@@ -470,11 +719,11 @@ def display_email_details():
     
     # Summary Section
     st.subheader('📝 AI-Generated Summary')
-    st.info(email['summary'])
+    st.info(email.summary)
     
     col1, col2 = st.columns(2)
     with col1:
-        st.caption(f"**Sentiment:** {email['sentiment'].title()}")
+        st.caption(f"**Sentiment:** {email.sentiment.title()}")
     with col2:
         st.caption(f"**Confidence:** High")
     
@@ -482,15 +731,21 @@ def display_email_details():
     with st.expander('📄 View Full Email'):
         st.text_area(
             'Email Body',
-            email['body'],
+            email.body,
             height=300,
             disabled=True,
-            key=f"body_{email['email_id']}"
+            key=f"body_{email.email_id}"
         )
     
     st.divider()
     
     # Smart Replies Section
+    display_reply_panel(email)
+
+
+@st.fragment
+def display_reply_panel(email: 'ProcessedEmail'):
+    """Smart reply tabs (a fragment, so reply buttons rerun only this panel)"""
     st.subheader('💬 Smart Reply Generator')
     
     reply_tabs = st.tabs(['✨ AI Suggestions', '✍️ Custom Reply', '📋 Reply History'])
@@ -498,7 +753,7 @@ def display_email_details():
     with reply_tabs[0]:
         st.caption('Tone-aware responses tailored to the email context')
         
-        for i, reply in enumerate(email['suggested_replies']):
+        for i, reply in enumerate(email.suggested_replies):
             tone = ['Professional', 'Friendly', 'Brief'][i] if i < 3 else 'Default'
             
             with st.container():
@@ -515,14 +770,13 @@ def display_email_details():
                 with col2:
                     if st.button(
                         '✓ Use',
-                        key=f"reply_{email['email_id']}_{i}",
+                        key=f"reply_{email.email_id}_{i}",
                         type='primary',
                         use_container_width=True
                     ):
-                        email['selected_action'] = f'{tone} Reply'
-                        email['drafted_reply'] = reply
+                        email.selected_action = f'{tone} Reply'
+                        email.drafted_reply = reply
                         st.success(f'{tone} reply selected!')
-                        st.rerun()
     
     with reply_tabs[1]:
         st.write('**Craft your own personalized response:**')
@@ -530,45 +784,52 @@ def display_email_details():
             'Your Reply',
             height=150,
             placeholder='Type your custom reply here...',
-            key=f"custom_{email['email_id']}"
+            key=f"custom_{email.email_id}"
         )
         
         col1, col2 = st.columns([3, 1])
         with col1:
-            if st.button('💾 Save Custom Reply', key=f"custom_btn_{email['email_id']}", use_container_width=True):
+            if st.button('💾 Save Custom Reply', key=f"custom_btn_{email.email_id}", use_container_width=True):
                 if custom_reply:
-                    email['selected_action'] = 'Custom Reply'
-                    email['drafted_reply'] = custom_reply
+                    email.selected_action = 'Custom Reply'
+                    email.drafted_reply = custom_reply
                     st.success('✅ Custom reply saved!')
-                    st.rerun()
                 else:
                     st.warning('Please enter a reply')
         
         with col2:
-            if st.button('🔄 Clear', key=f"clear_custom_{email['email_id']}", use_container_width=True):
-                st.rerun()
+            st.button(
+                '🔄 Clear',
+                key=f"clear_custom_{email.email_id}",
+                use_container_width=True,
+                on_click=clear_custom_reply,
+                args=(email.email_id,)
+            )
     
     with reply_tabs[2]:
         # Show drafted reply if exists
-        if email.get('drafted_reply'):
+        if email.drafted_reply:
             st.success('**✅ Prepared Reply:**')
             st.markdown(f"""
             <div style="background: #e8f5e9; padding: 15px; border-radius: 10px; border-left: 4px solid #4caf50;">
-                <strong>Selected: {email.get('selected_action', 'Reply')}</strong>
-                <p style="margin-top: 10px;">{email['drafted_reply']}</p>
+                <strong>Selected: {email.selected_action}</strong>
+                <p style="margin-top: 10px;">{email.drafted_reply}</p>
             </div>
             """, unsafe_allow_html=True)
             
             col1, col2 = st.columns([3, 1])
             with col1:
-                if st.button('📤 Send Email', key=f"send_{email['email_id']}", use_container_width=True, type='primary'):
+                if st.button('📤 Send Email', key=f"send_{email.email_id}", use_container_width=True, type='primary'):
                     st.success('✅ Email sent! (Mock mode)')
             
             with col2:
-                if st.button('🗑️ Discard', key=f"clear_{email['email_id']}", use_container_width=True):
-                    email['selected_action'] = None
-                    email['drafted_reply'] = ''
-                    st.rerun()
+                st.button(
+                    '🗑️ Discard',
+                    key=f"clear_{email.email_id}",
+                    use_container_width=True,
+                    on_click=discard_reply,
+                    args=(email,)
+                )
         else:
             st.info('No reply prepared yet. Select a suggested reply or write a custom one.')
 
@@ -578,7 +839,7 @@ def main():
     
     # Initialize
     init_session_state()
-    Config.validate()
+    bootstrap()
     
     # Enhanced Header
     st.markdown('<div class="main-header">🧠 MailMind Neural Intelligence</div>', unsafe_allow_html=True)
@@ -609,13 +870,13 @@ def main():
     with col4:
         if st.button('📋 Export Data', use_container_width=True):
             if st.session_state.processed_emails:
-                csv_data, filename = CSVExporter.export_to_csv(
-                    list(st.session_state.processed_emails.values())
+                csv_data = CSVExporter.export_to_bytes(
+                    st.session_state.processed_emails_list
                 )
                 st.download_button(
                     label='⬇️ Download CSV',
                     data=csv_data,
-                    file_name=filename,
+                    file_name=CSVExporter.default_filename(),
                     mime='text/csv',
                     use_container_width=True
                 )
@@ -660,18 +921,38 @@ def generate_advanced_insights():
     if not st.session_state.processed_emails:
         return
     
-    emails_list = list(st.session_state.processed_emails.values())
+    emails_list = st.session_state.processed_emails_list
     
     # Generate executive summary
     st.session_state.executive_summary = EmailInsightGenerator.generate_executive_summary(emails_list)
     
+    # Response predictions share one clock reading across the batch
+    response_times = EmailPatternAnalyzer.predict_response_time_batch(emails_list)
+    
+    # Aggregates for the analytics view are built here once instead of on every rerun
+    analytics = new_analytics()
+    
+    # Large inboxes are analyzed across worker processes; pool startup and
+    # pickling cost more than the analysis itself for smaller batches
+    if len(emails_list) >= Config.PARALLEL_ANALYSIS_MIN_EMAILS:
+        fields = [
+            {'subject': email.subject, 'body': email.body, 'sender': email.sender}
+            for email in emails_list
+        ]
+        analyses = get_process_pool().map(
+            EmailInsightGenerator.analyze_email, fields, chunksize=200
+        )
+    else:
+        # The analyzers memoize their own text scans, so they are called directly
+        analyses = map(EmailInsightGenerator.analyze_email, emails_list)
+    
     # Analyze patterns for each email
-    for email_id, email in st.session_state.processed_emails.items():
-        pattern = EmailPatternAnalyzer.detect_communication_style(email)
-        entities = EmailPatternAnalyzer.extract_entities(email)
-        response_time = EmailPatternAnalyzer.predict_response_time(email)
-        category = SmartCategorizer.detect_email_category(email)
-        relationship = SmartCategorizer.detect_sender_relationship(email)
+    for email, response_time, analysis in zip(emails_list, response_times, analyses):
+        email_id = email.email_id
+        pattern = analysis['pattern']
+        entities = analysis['entities']
+        category = analysis['category']
+        relationship = analysis['relationship']
         
         st.session_state.email_patterns[email_id] = {
             'pattern': pattern,
@@ -680,6 +961,24 @@ def generate_advanced_insights():
             'category': category,
             'relationship': relationship
         }
+        
+        analytics['formality_sum'] += pattern['formality_score']
+        analytics['emotion'][pattern['emotion']] += 1
+        analytics['category'][category] += 1
+        analytics['relationship'][relationship] += 1
+        # Only the totals and the first few mentions are displayed
+        analytics['date_count'] += len(entities['dates'])
+        analytics['date_samples'].extend(entities['dates'][:3 - len(analytics['date_samples'])])
+        analytics['amount_count'] += len(entities['monetary_amounts'])
+        analytics['amount_samples'].extend(entities['monetary_amounts'][:3 - len(analytics['amount_samples'])])
+        analytics['actions'].update(entities['action_items'])
+        if response_time['recommended_response_hours'] <= 2:
+            analytics['urgent_count'] += 1
+        if response_time['priority_score'] > 80:
+            analytics['high_priority_count'] += 1
+        analytics['response_hours_sum'] += response_time['recommended_response_hours']
+    
+    st.session_state.analytics = analytics
 
 
 def display_executive_dashboard():
@@ -691,36 +990,25 @@ def display_executive_dashboard():
     
     st.markdown('### 🎯 Executive Command Center')
     
-    # Top metrics row
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric('Total Emails', summary['total_emails'])
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric('High Priority', summary['high_priority_count'], 
-                 delta=f"{summary['action_required_count']} need action")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col3:
-        workload_color = '🔴' if summary['workload_score'] > 70 else '🟡' if summary['workload_score'] > 40 else '🟢'
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric('Workload', f"{workload_color} {summary['workload_level']}")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col4:
-        risk_color = '🔴' if summary['risk_score'] > 60 else '🟡' if summary['risk_score'] > 30 else '🟢'
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric('Risk Level', f"{risk_color} {summary['risk_level']}")
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col5:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric('Processing Time', f"~{summary['estimated_processing_minutes']} min")
-        st.markdown('</div>', unsafe_allow_html=True)
+    # Top metrics row, rendered as one HTML block instead of a column and
+    # three elements per card
+    workload_color = '🔴' if summary['workload_score'] > 70 else '🟡' if summary['workload_score'] > 40 else '🟢'
+    risk_color = '🔴' if summary['risk_score'] > 60 else '🟡' if summary['risk_score'] > 30 else '🟢'
+    metrics = [
+        ('Total Emails', summary['total_emails'], ''),
+        ('High Priority', summary['high_priority_count'], f"↑ {summary['action_required_count']} need action"),
+        ('Workload', f"{workload_color} {summary['workload_level']}", ''),
+        ('Risk Level', f"{risk_color} {summary['risk_level']}", ''),
+        ('Processing Time', f"~{summary['estimated_processing_minutes']} min", '')
+    ]
+    cards = ''.join(
+        f'<div class="metric-card"><div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{value}</div>'
+        + (f'<div class="metric-delta">{delta}</div>' if delta else '')
+        + '</div>'
+        for label, value, delta in metrics
+    )
+    st.markdown(f'<div class="metrics-row">{cards}</div>', unsafe_allow_html=True)
     
     # Strategic recommendation
     st.markdown(f"""
@@ -755,101 +1043,62 @@ def display_advanced_analytics():
     # Communication style distribution
     st.markdown('#### 🎨 Communication Patterns')
     
-    formality_scores = []
-    emotion_distribution = {}
-    categories = {}
-    relationships = {}
-    
-    for email_id, data in st.session_state.email_patterns.items():
-        pattern = data['pattern']
-        formality_scores.append(pattern['formality_score'])
-        
-        emotion = pattern['emotion']
-        emotion_distribution[emotion] = emotion_distribution.get(emotion, 0) + 1
-        
-        category = data['category']
-        categories[category] = categories.get(category, 0) + 1
-        
-        relationship = data['relationship']
-        relationships[relationship] = relationships.get(relationship, 0) + 1
+    analytics = st.session_state.analytics
+    total = len(st.session_state.email_patterns)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown('**Formality Distribution**')
-        avg_formality = sum(formality_scores) / len(formality_scores) if formality_scores else 0
+        avg_formality = analytics['formality_sum'] / total if total else 0
         st.metric('Average Formality', f"{int(avg_formality)}/100")
         st.progress(avg_formality / 100)
         
         st.markdown('**Emotional Tone**')
-        for emotion, count in sorted(emotion_distribution.items(), key=lambda x: x[1], reverse=True):
+        for emotion, count in analytics['emotion'].most_common():
             st.write(f"{emotion.title()}: {count} emails")
     
     with col2:
         st.markdown('**Email Categories**')
-        for category, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        for category, count in analytics['category'].most_common():
             st.write(f"{category}: {count}")
         
         st.markdown('**Sender Relationships**')
-        for rel, count in sorted(relationships.items(), key=lambda x: x[1], reverse=True):
+        for rel, count in analytics['relationship'].most_common():
             st.write(f"{rel}: {count}")
     
     # Entity extraction summary
     st.markdown('#### 🔍 Extracted Entities Across All Emails')
     
-    all_dates = []
-    all_amounts = []
-    all_actions = []
-    
-    for data in st.session_state.email_patterns.values():
-        entities = data['entities']
-        all_dates.extend(entities['dates'])
-        all_amounts.extend(entities['monetary_amounts'])
-        all_actions.extend(entities['action_items'])
-    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric('📅 Dates Found', len(all_dates))
-        if all_dates[:3]:
-            for date in all_dates[:3]:
+        st.metric('📅 Dates Found', analytics['date_count'])
+        if analytics['date_samples']:
+            for date in analytics['date_samples']:
                 st.caption(f"• {date}")
     
     with col2:
-        st.metric('� Money Mentions', len(all_amounts))
-        if all_amounts[:3]:
-            for amount in all_amounts[:3]:
+        st.metric('� Money Mentions', analytics['amount_count'])
+        if analytics['amount_samples']:
+            for amount in analytics['amount_samples']:
                 st.caption(f"• {amount}")
     
     with col3:
-        st.metric('✅ Action Items', len(set(all_actions)))
-        action_count = {}
-        for action in all_actions:
-            action_count[action] = action_count.get(action, 0) + 1
-        for action, count in sorted(action_count.items(), key=lambda x: x[1], reverse=True)[:3]:
+        st.metric('✅ Action Items', len(analytics['actions']))
+        for action, count in analytics['actions'].most_common(3):
             st.caption(f"• {action.title()} ({count}x)")
     
     # Response time predictions
     st.markdown('#### ⏱️ Response Time Intelligence')
     
-    urgent_count = 0
-    overdue_risk = 0
-    
-    for data in st.session_state.email_patterns.values():
-        pred = data['response_prediction']
-        if pred['recommended_response_hours'] <= 2:
-            urgent_count += 1
-        if pred['priority_score'] > 80:
-            overdue_risk += 1
-    
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric('🔥 Urgent (< 2hr)', urgent_count)
+        st.metric('🔥 Urgent (< 2hr)', analytics['urgent_count'])
     with col2:
-        st.metric('⚠️ High Priority', overdue_risk)
+        st.metric('⚠️ High Priority', analytics['high_priority_count'])
     with col3:
-        avg_hours = sum(data['response_prediction']['recommended_response_hours'] 
-                       for data in st.session_state.email_patterns.values()) / len(st.session_state.email_patterns)
+        avg_hours = analytics['response_hours_sum'] / total
         st.metric('📊 Avg Response Time', f"{avg_hours:.1f} hrs")
 
 
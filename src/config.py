@@ -19,14 +19,21 @@ class Config:
     
     # Gmail API
     GMAIL_CREDENTIALS_PATH = os.getenv('GMAIL_CREDENTIALS_PATH', 'credentials.json')
-    GMAIL_TOKEN_PATH = 'token.pickle'
+    GMAIL_TOKEN_PATH = 'token.json'
+    # Pickled token written by earlier versions, migrated to JSON on first load
+    GMAIL_LEGACY_TOKEN_PATH = 'token.pickle'
     GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     
     # Application Settings
     USE_MOCK_DATA = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
     MAX_EMAILS_PER_BATCH = int(os.getenv('MAX_EMAILS_PER_BATCH', '50'))
     AI_TIMEOUT_SECONDS = int(os.getenv('AI_TIMEOUT_SECONDS', '30'))
+    MAX_CONCURRENT_AI_REQUESTS = int(os.getenv('MAX_CONCURRENT_AI_REQUESTS', '10'))
+    AI_EMAILS_PER_REQUEST = int(os.getenv('AI_EMAILS_PER_REQUEST', '5'))
+    PARALLEL_ANALYSIS_MIN_EMAILS = int(os.getenv('PARALLEL_ANALYSIS_MIN_EMAILS', '2000'))
     ENABLE_AI_FALLBACK = os.getenv('ENABLE_AI_FALLBACK', 'true').lower() == 'true'
+    # Processed results saved between sessions (empty to disable)
+    PROCESSED_CACHE_PATH = os.getenv('PROCESSED_CACHE_PATH', 'processed_emails.json')
     
     # Intent Categories
     INTENT_CATEGORIES = [
@@ -43,6 +50,11 @@ class Config:
     # Sentiment Tags
     SENTIMENT_TAGS = ['Positive', 'Neutral', 'Negative']
     
+    # Lookup sets for validating AI-provided labels
+    INTENT_CATEGORIES_SET = frozenset(INTENT_CATEGORIES)
+    URGENCY_LEVELS_SET = frozenset(URGENCY_LEVELS)
+    SENTIMENT_TAGS_SET = frozenset(SENTIMENT_TAGS)
+    
     # Reply Templates
     REPLY_TEMPLATES = {
         'thank_you': 'Thank you for the update. I appreciate you keeping me informed.',
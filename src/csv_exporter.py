@@ -5,6 +5,7 @@ Handles exporting email processing data to CSV with proper formatting
 
 import csv
 import io
+from collections import Counter
 from typing import List, Dict
 from datetime import datetime
 
@@ -27,6 +28,12 @@ class CSVExporter:
         'processed_at'
     ]
     
+    @classmethod
+    def default_filename(cls) -> str:
+        """Timestamped filename for a new export"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f'mailmind_export_{timestamp}.csv'
+    
     @classmethod
     def export_to_csv(cls, processed_emails: List[Dict], filename: str = None) -> str:
         """
@@ -40,33 +47,11 @@ class CSVExporter:
             CSV content as string
         """
         if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'mailmind_export_{timestamp}.csv'
-        
-        # Prepare data for export
-        rows = []
-        for email in processed_emails:
-            row = {
-                'email_id': email.get('email_id', ''),
-                'sender': email.get('sender', ''),
-                'sender_name': email.get('sender_name', ''),
-                'subject': email.get('subject', ''),
-                'received_at': cls._format_datetime(email.get('timestamp')),
-                'summary': cls._clean_text(email.get('summary', '')),
-                'intent': email.get('intent', ''),
-                'urgency': email.get('urgency', ''),
-                'sentiment': email.get('sentiment', ''),
-                'selected_action': email.get('selected_action', 'None'),
-                'drafted_reply': cls._clean_text(email.get('drafted_reply', '')),
-                'processed_at': cls._format_datetime(email.get('processed_at', datetime.now()))
-            }
-            rows.append(row)
+            filename = cls.default_filename()
         
         # Create CSV string using csv module
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=cls.COLUMN_HEADERS, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        writer.writerows(rows)
+        cls._write_rows(output, processed_emails)
         csv_string = output.getvalue()
         output.close()
         
@@ -83,8 +68,42 @@ class CSVExporter:
         Returns:
             CSV content as bytes
         """
-        csv_string, _ = cls.export_to_csv(processed_emails)
-        return csv_string.encode('utf-8')
+        # Encode while writing instead of building a string and encoding a copy
+        output = io.BytesIO()
+        wrapper = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+        cls._write_rows(wrapper, processed_emails)
+        wrapper.flush()
+        csv_bytes = output.getvalue()
+        wrapper.close()
+        
+        return csv_bytes
+    
+    @classmethod
+    def _write_rows(cls, stream, processed_emails: List[Dict]):
+        """Write the header and one row per processed email to a text stream"""
+        # Stream rows straight into the CSV writer as tuples in header order
+        now = datetime.now()
+        rows = (
+            (
+                email.get('email_id', ''),
+                email.get('sender', ''),
+                email.get('sender_name', ''),
+                email.get('subject', ''),
+                cls._format_datetime(email.get('timestamp')),
+                cls._clean_text(email.get('summary', '')),
+                email.get('intent', ''),
+                email.get('urgency', ''),
+                email.get('sentiment', ''),
+                email.get('selected_action', 'None'),
+                cls._clean_text(email.get('drafted_reply', '')),
+                cls._format_datetime(email.get('processed_at', now))
+            )
+            for email in processed_emails
+        )
+        
+        writer = csv.writer(stream, quoting=csv.QUOTE_ALL)
+        writer.writerow(cls.COLUMN_HEADERS)
+        writer.writerows(rows)
     
     @classmethod
     def _format_datetime(cls, dt) -> str:
@@ -101,12 +120,7 @@ class CSVExporter:
         if not text:
             return ''
         
-        # Replace problematic characters
-        text = text.replace('\r\n', ' ')
-        text = text.replace('\n', ' ')
-        text = text.replace('\r', ' ')
-        
-        # Remove multiple spaces
+        # Collapse newlines and runs of whitespace (split() covers \r and \n)
         text = ' '.join(text.split())
         
         return text
@@ -131,37 +145,18 @@ class CSVExporter:
                 'processed_count': 0
             }
         
-        # Count by categories without pandas
-        intent_counts = {}
-        urgency_counts = {}
-        sentiment_counts = {}
-        processed_count = 0
-        
-        for email in processed_emails:
-            # Count intents
-            intent = email.get('intent', '')
-            if intent:
-                intent_counts[intent] = intent_counts.get(intent, 0) + 1
-            
-            # Count urgency
-            urgency = email.get('urgency', '')
-            if urgency:
-                urgency_counts[urgency] = urgency_counts.get(urgency, 0) + 1
-            
-            # Count sentiment
-            sentiment = email.get('sentiment', '')
-            if sentiment:
-                sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-            
-            # Count processed
-            if email.get('processed_at'):
-                processed_count += 1
+        # Count by categories without pandas (each Counter consumes its
+        # field values in a C-level loop, skipping empty labels)
+        intent_counts = Counter(filter(None, (email.get('intent', '') for email in processed_emails)))
+        urgency_counts = Counter(filter(None, (email.get('urgency', '') for email in processed_emails)))
+        sentiment_counts = Counter(filter(None, (email.get('sentiment', '') for email in processed_emails)))
+        processed_count = sum(1 for email in processed_emails if email.get('processed_at'))
         
         stats = {
             'total_emails': len(processed_emails),
-            'by_intent': intent_counts,
-            'by_urgency': urgency_counts,
-            'by_sentiment': sentiment_counts,
+            'by_intent': dict(intent_counts),
+            'by_urgency': dict(urgency_counts),
+            'by_sentiment': dict(sentiment_counts),
             'processed_count': processed_count
         }
         
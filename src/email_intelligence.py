@@ -5,7 +5,9 @@ Handles summarization, classification, and reply generation with fallback logic
 
 import asyncio
 import re
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 # Optional OpenAI import - only needed for AI features
@@ -16,7 +18,273 @@ except ImportError:
     OPENAI_AVAILABLE = False
     openai = None
 
+# Optional Aho-Corasick matcher - only needed for faster keyword scans
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
 from config import Config
+from records import RecordMapping
+
+
+# Rule-based classification keywords. Intent tables are checked in order.
+_INTENT_KEYWORDS = (
+    # Spam/Low Priority indicators
+    ('Spam/Low Priority', ('winner', 'congratulations!!!', 'claim your prize',
+                           'click here', 'limited time', 'act now', '$$$')),
+    # Meeting Request indicators
+    ('Meeting Request', ('meeting', 'schedule', 'calendar', 'availability',
+                         'call', 'conference', 'zoom', 'teams')),
+    # Action Required indicators
+    ('Action Required', ('urgent', 'asap', 'action required', 'please',
+                         'need', 'must', 'required', 'approve', 'confirm')),
+    # Follow-up indicators
+    ('Follow-up', ('follow up', 'following up', 're:', 'regarding',
+                   'update', 'status', 'checking in'))
+)
+
+_SPAM_KEYWORDS = frozenset(_INTENT_KEYWORDS[0][1])
+
+_HIGH_URGENCY_KEYWORDS = ('urgent', 'asap', 'immediately', 'critical',
+                          'emergency', 'today', 'deadline', 'must')
+_LOW_URGENCY_KEYWORDS = ('fyi', 'for your information', 'newsletter',
+                         'update', 'digest', 'no action required')
+
+# Numbered reply prefix in AI responses and sentence breaks for basic summaries
+_REPLY_NUMBER_RE = re.compile(r'^\d+\.\s*')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Section header lines in structured AI responses, e.g. 'INTENT: Meeting Request'
+_AI_SECTION_RE = re.compile(
+    r'^\s*(SUMMARY|INTENT|URGENCY|SENTIMENT|SUGGESTED_REPLIES):(.*)$',
+    re.MULTILINE
+)
+
+# Response layout requested from the AI for each email
+_AI_RESPONSE_FORMAT = """SUMMARY: (3-5 lines summarizing the key points and any required actions)
+
+INTENT: (Choose ONE: Informational, Action Required, Meeting Request, Follow-up, Spam/Low Priority)
+
+URGENCY: (Choose ONE: High, Medium, Low)
+
+SENTIMENT: (Choose ONE: Positive, Neutral, Negative)
+
+SUGGESTED_REPLIES:
+1. [Short reply option 1]
+2. [Short reply option 2]
+3. [Short reply option 3]
+"""
+
+# Result markers in multi-email AI responses, e.g. 'RESULT 2:'
+_AI_RESULT_RE = re.compile(r'^\s*RESULT\s+(\d+):', re.MULTILINE)
+
+# Template replies per intent, built once from Config.REPLY_TEMPLATES
+_DEFAULT_TEMPLATE_REPLIES = (
+    Config.REPLY_TEMPLATES['acknowledged'],
+    Config.REPLY_TEMPLATES['thank_you']
+)
+_TEMPLATE_REPLIES = {
+    'Action Required': (
+        Config.REPLY_TEMPLATES['review'],
+        Config.REPLY_TEMPLATES['acknowledged'],
+        Config.REPLY_TEMPLATES['need_more_info']
+    ),
+    'Meeting Request': (
+        Config.REPLY_TEMPLATES['meeting_confirmed'],
+        "Let me check my calendar and get back to you.",
+        "Could we schedule this for next week instead?"
+    ),
+    'Follow-up': (
+        Config.REPLY_TEMPLATES['review'],
+        Config.REPLY_TEMPLATES['thank_you'],
+        "Thanks for the follow-up. I'll prioritize this."
+    ),
+    'Spam/Low Priority': (
+        Config.REPLY_TEMPLATES['not_relevant'],
+        "Please remove me from this mailing list.",
+        "Not interested, thank you."
+    )
+}
+
+# Email ages that raise or lower rule-based urgency
+_RECENT_EMAIL_AGE = timedelta(hours=3)
+_OLD_EMAIL_AGE = timedelta(hours=48)
+
+_POSITIVE_KEYWORDS = ('thank', 'excellent', 'great', 'wonderful',
+                      'appreciate', 'impressed', 'congratulations',
+                      'happy', 'pleased', 'perfect')
+_NEGATIVE_KEYWORDS = ('issue', 'problem', 'error', 'failed', 'wrong',
+                      'disappointed', 'concerned', 'urgent', 'critical',
+                      'complaint')
+
+_RULE_KEYWORDS = tuple(dict.fromkeys(
+    [kw for _, keywords in _INTENT_KEYWORDS for kw in keywords]
+    + list(_HIGH_URGENCY_KEYWORDS + _LOW_URGENCY_KEYWORDS)
+    + list(_POSITIVE_KEYWORDS + _NEGATIVE_KEYWORDS)
+))
+
+# Inflected forms that count as their single-word keyword (the forms a
+# substring scan would catch, without 'must' matching 'mustard')
+_KEYWORD_INFLECTIONS = {
+    'winner': ('winners',),
+    'meeting': ('meetings',),
+    'schedule': ('schedules', 'scheduled'),
+    'calendar': ('calendars',),
+    'call': ('calls', 'called', 'calling'),
+    'conference': ('conferences',),
+    'urgent': ('urgently',),
+    'need': ('needs', 'needed', 'needing'),
+    'approve': ('approves', 'approved'),
+    'confirm': ('confirms', 'confirmed', 'confirming', 'confirmation'),
+    'update': ('updates', 'updated'),
+    'critical': ('critically',),
+    'deadline': ('deadlines',),
+    'newsletter': ('newsletters',),
+    'digest': ('digests',),
+    'thank': ('thanks', 'thanked', 'thanking', 'thankful'),
+    'great': ('greater', 'greatest', 'greatly'),
+    'appreciate': ('appreciated', 'appreciates'),
+    'perfect': ('perfectly',),
+    'issue': ('issues',),
+    'problem': ('problems',),
+    'error': ('errors',),
+    'wrong': ('wrongly',),
+    'complaint': ('complaints',)
+}
+
+# Single-word keywords match whole words or their listed inflections;
+# phrases and punctuated keywords like 're:' are still matched as substrings.
+# Apostrophes split words, so "meeting's" still yields 'meeting'.
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_RULE_PHRASES = tuple(kw for kw in _RULE_KEYWORDS if not _WORD_RE.fullmatch(kw))
+_RULE_WORD_FORMS = {kw: kw for kw in _RULE_KEYWORDS if _WORD_RE.fullmatch(kw)}
+_RULE_WORD_FORMS.update(
+    (form, keyword)
+    for keyword, forms in _KEYWORD_INFLECTIONS.items()
+    for form in forms
+)
+
+# One automaton over every rule phrase, so an email is scanned once for all classifiers
+_RULE_AUTOMATON = None
+if AHOCORASICK_AVAILABLE:
+    _RULE_AUTOMATON = ahocorasick.Automaton()
+    for _phrase in _RULE_PHRASES:
+        _RULE_AUTOMATON.add_word(_phrase, _phrase)
+    _RULE_AUTOMATON.make_automaton()
+
+
+@lru_cache(maxsize=4096)
+def _find_rule_keywords(text: str) -> frozenset:
+    """Return the rule keywords that appear in lowercase text (cached per text)"""
+    found = {_RULE_WORD_FORMS[word] for word in _WORD_RE.findall(text) if word in _RULE_WORD_FORMS}
+    if _RULE_AUTOMATON is not None:
+        found.update(phrase for _, phrase in _RULE_AUTOMATON.iter(text))
+    else:
+        found.update(phrase for phrase in _RULE_PHRASES if phrase in text)
+    return frozenset(found)
+
+
+def _is_obvious_spam(email: Dict) -> bool:
+    """Cheap check for Gmail's SPAM label or several spam keywords near the top"""
+    if 'SPAM' in (email.get('labels') or ()):
+        return True
+    
+    # One keyword alone ('click here', 'winner') shows up in legitimate mail too
+    body = email.get('body', email.get('snippet', ''))
+    text = f"{email.get('subject', '')} {body[:200]}".lower()
+    return len(_SPAM_KEYWORDS & _find_rule_keywords(text)) >= 2
+
+
+@lru_cache(maxsize=4096)
+def _basic_summary(subject: str, body: str, sender_name: str) -> str:
+    """Build the rule-based summary for an email's fields (cached)"""
+    # Extract first few sentences from body
+    sentences = _SENTENCE_SPLIT_RE.split(body)
+    key_sentences = [s.strip() for s in sentences[:3] if s.strip()]
+    
+    summary = f"{sender_name} sent an email regarding: {subject}. "
+    
+    if key_sentences:
+        summary += ' '.join(key_sentences[:2])
+        if len(summary) > 250:
+            summary = summary[:247] + '...'
+    
+    return summary
+
+
+@lru_cache(maxsize=256)
+def _parse_ai_sections(response: str) -> Tuple[str, str, str, str, Tuple[str, ...]]:
+    """
+    Parse the sections of a structured AI response (cached per response)
+    
+    Returns:
+        Tuple of (summary, intent, urgency, sentiment, replies); summary and
+        replies are empty when the response leaves them out
+    """
+    result = {
+        'summary': '',
+        'intent': 'Informational',
+        'urgency': 'Medium',
+        'sentiment': 'Neutral',
+        'suggested_replies': []
+    }
+    
+    headers = list(_AI_SECTION_RE.finditer(response))
+    
+    for i, header in enumerate(headers):
+        section = header.group(1)
+        value = header.group(2).replace(section + ':', '').strip()
+        
+        # Lines up to the next header belong to this section
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+        lines = [line.strip() for line in response[header.end():end].split('\n')]
+        
+        if section == 'SUMMARY':
+            result['summary'] = ' '.join([value] + [line for line in lines if line])
+        elif section == 'INTENT':
+            if value in Config.INTENT_CATEGORIES_SET:
+                result['intent'] = value
+        elif section == 'URGENCY':
+            if value in Config.URGENCY_LEVELS_SET:
+                result['urgency'] = value
+        elif section == 'SENTIMENT':
+            if value in Config.SENTIMENT_TAGS_SET:
+                result['sentiment'] = value
+        else:
+            for line in lines:
+                if line:
+                    # Extract numbered replies
+                    reply = _REPLY_NUMBER_RE.sub('', line).strip('[]')
+                    if reply:
+                        result['suggested_replies'].append(reply)
+    
+    return (result['summary'], result['intent'], result['urgency'],
+            result['sentiment'], tuple(result['suggested_replies']))
+
+
+@dataclass(slots=True)
+class ProcessedEmail(RecordMapping):
+    """Email combined with its intelligence results, stored as a compact slotted record"""
+    email_id: str
+    sender: str
+    sender_name: str
+    subject: str
+    body: str
+    snippet: str = ''
+    timestamp: Optional[datetime] = None
+    timestamp_str: str = ''
+    labels: List[str] = field(default_factory=list)
+    summary: str = ''
+    intent: str = ''
+    urgency: str = ''
+    sentiment: str = ''
+    suggested_replies: List[str] = field(default_factory=list)
+    selected_action: Optional[str] = None
+    drafted_reply: str = ''
+    processed_at: Optional[datetime] = None
 
 
 class EmailIntelligence:
@@ -31,43 +299,56 @@ class EmailIntelligence:
         """
         self.api_key = api_key or Config.OPENAI_API_KEY
         
+        # Async client, created per event loop since its connection pool is loop-bound
+        self._client = None
+        self._client_loop = None
+        
         # Check if OpenAI is available and configured
         if not OPENAI_AVAILABLE:
             self.use_ai = False
             print("OpenAI library not installed. Using rule-based processing.")
         elif self.api_key:
-            openai.api_key = self.api_key
             self.use_ai = True
         else:
             self.use_ai = False
     
-    async def process_email(self, email: Dict) -> Dict:
+    def _get_client(self):
+        """Return the async OpenAI client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = openai.AsyncOpenAI(api_key=self.api_key)
+            self._client_loop = loop
+        return self._client
+    
+    async def process_email(self, email: Dict, now: Optional[datetime] = None) -> Dict:
         """
         Process a single email with AI analysis
         
         Args:
             email: Email dictionary with subject, body, sender, timestamp
+            now: Reference time for rule-based urgency (defaults to the current time)
             
         Returns:
             Dictionary with summary, intent, urgency, sentiment, and replies
         """
         try:
-            if self.use_ai:
-                result = await self._ai_process_email(email)
+            # Obvious spam is classified by rules without an AI round-trip
+            if self.use_ai and not _is_obvious_spam(email):
+                result = await self._ai_process_email(email, now)
             else:
-                result = self._rule_based_process_email(email)
+                result = self._rule_based_process_email(email, now)
             
             return result
             
         except Exception as e:
             print(f"Error processing email {email.get('id', 'unknown')}: {e}")
             # Fallback to rule-based processing
-            return self._rule_based_process_email(email)
+            return self._rule_based_process_email(email, now)
     
-    async def _ai_process_email(self, email: Dict) -> Dict:
-        """Process email using OpenAI GPT"""
-        
-        email_text = f"""
+    @staticmethod
+    def _format_email_text(email: Dict) -> str:
+        """Format an email's headers and body for an AI prompt"""
+        return f"""
 Subject: {email.get('subject', 'No Subject')}
 From: {email.get('sender_name', 'Unknown')} <{email.get('sender', 'unknown@example.com')}>
 Date: {email.get('timestamp', datetime.now()).strftime('%Y-%m-%d %H:%M')}
@@ -75,100 +356,113 @@ Date: {email.get('timestamp', datetime.now()).strftime('%Y-%m-%d %H:%M')}
 Body:
 {email.get('body', email.get('snippet', ''))}
 """
+    
+    async def _request_completion(self, prompt: str, max_tokens: int, timeout: Optional[float] = None) -> str:
+        """Send one chat completion request and return the response text"""
+        # Native async request: concurrent emails share the loop and one
+        # connection pool instead of each holding a worker thread
+        response = await asyncio.wait_for(
+            self._get_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are an expert email assistant that analyzes emails and provides concise, actionable insights."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=max_tokens
+            ),
+            timeout=timeout or Config.AI_TIMEOUT_SECONDS
+        )
+        return response.choices[0].message.content
+    
+    async def _ai_process_email(self, email: Dict, now: Optional[datetime] = None) -> Dict:
+        """Process email using OpenAI GPT"""
+        
+        email_text = self._format_email_text(email)
         
         prompt = f"""Analyze this email and provide a structured response in the following format:
 
-SUMMARY: (3-5 lines summarizing the key points and any required actions)
-
-INTENT: (Choose ONE: Informational, Action Required, Meeting Request, Follow-up, Spam/Low Priority)
-
-URGENCY: (Choose ONE: High, Medium, Low)
-
-SENTIMENT: (Choose ONE: Positive, Neutral, Negative)
-
-SUGGESTED_REPLIES:
-1. [Short reply option 1]
-2. [Short reply option 2]
-3. [Short reply option 3]
-
+{_AI_RESPONSE_FORMAT}
 Email to analyze:
 {email_text}
 """
         
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(
-                    openai.chat.completions.create,
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an expert email assistant that analyzes emails and provides concise, actionable insights."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500
-                ),
-                timeout=Config.AI_TIMEOUT_SECONDS
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._request_completion(prompt, max_tokens=500)
             return self._parse_ai_response(content, email)
             
         except asyncio.TimeoutError:
             print(f"AI processing timeout for email {email.get('id')}")
             if Config.ENABLE_AI_FALLBACK:
-                return self._rule_based_process_email(email)
+                return self._rule_based_process_email(email, now)
+            raise
+        except Exception as e:
+            print(f"AI processing error: {e}")
+            if Config.ENABLE_AI_FALLBACK:
+                return self._rule_based_process_email(email, now)
+            raise
+    
+    async def _ai_process_chunk(self, emails: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """Process several emails with a single OpenAI request"""
+        
+        email_texts = ''.join(
+            f"\nEMAIL {i}:{self._format_email_text(email)}"
+            for i, email in enumerate(emails, 1)
+        )
+        
+        prompt = f"""Analyze each of the following {len(emails)} emails. For every email, start a line with RESULT <number>: (matching its EMAIL number) and then provide a structured response in the following format:
+
+{_AI_RESPONSE_FORMAT}
+Emails to analyze:
+{email_texts}
+"""
+        
+        try:
+            # A chunk's completion is about len(emails) times longer, so its deadline scales too
+            content = await self._request_completion(
+                prompt,
+                max_tokens=500 * len(emails),
+                timeout=Config.AI_TIMEOUT_SECONDS * len(emails)
+            )
+        except asyncio.TimeoutError:
+            print(f"AI processing timeout for {len(emails)} emails")
+            if Config.ENABLE_AI_FALLBACK:
+                return [self._rule_based_process_email(email, now) for email in emails]
             raise
         except Exception as e:
             print(f"AI processing error: {e}")
             if Config.ENABLE_AI_FALLBACK:
-                return self._rule_based_process_email(email)
+                return [self._rule_based_process_email(email, now) for email in emails]
             raise
+        
+        # Split the response at its RESULT markers, keyed by email number
+        sections = {}
+        markers = list(_AI_RESULT_RE.finditer(content))
+        for i, marker in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(content)
+            sections[int(marker.group(1))] = content[marker.end():end]
+        
+        results = []
+        for i, email in enumerate(emails, 1):
+            if i in sections:
+                results.append(self._parse_ai_response(sections[i], email))
+            else:
+                # The model skipped this email; fall back to rules for it alone
+                results.append(self._rule_based_process_email(email, now))
+        return results
     
     def _parse_ai_response(self, response: str, email: Dict) -> Dict:
         """Parse structured AI response"""
         
+        summary, intent, urgency, sentiment, replies = _parse_ai_sections(response)
         result = {
-            'summary': '',
-            'intent': 'Informational',
-            'urgency': 'Medium',
-            'sentiment': 'Neutral',
-            'suggested_replies': []
+            'summary': summary,
+            'intent': intent,
+            'urgency': urgency,
+            'sentiment': sentiment,
+            'suggested_replies': list(replies)
         }
         
-        lines = response.strip().split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('SUMMARY:'):
-                result['summary'] = line.replace('SUMMARY:', '').strip()
-                current_section = 'summary'
-            elif line.startswith('INTENT:'):
-                intent = line.replace('INTENT:', '').strip()
-                if intent in Config.INTENT_CATEGORIES:
-                    result['intent'] = intent
-                current_section = None
-            elif line.startswith('URGENCY:'):
-                urgency = line.replace('URGENCY:', '').strip()
-                if urgency in Config.URGENCY_LEVELS:
-                    result['urgency'] = urgency
-                current_section = None
-            elif line.startswith('SENTIMENT:'):
-                sentiment = line.replace('SENTIMENT:', '').strip()
-                if sentiment in Config.SENTIMENT_TAGS:
-                    result['sentiment'] = sentiment
-                current_section = None
-            elif line.startswith('SUGGESTED_REPLIES:'):
-                current_section = 'replies'
-            elif current_section == 'summary' and line:
-                result['summary'] += ' ' + line
-            elif current_section == 'replies' and line:
-                # Extract numbered replies
-                reply = re.sub(r'^\d+\.\s*', '', line).strip('[]')
-                if reply:
-                    result['suggested_replies'].append(reply)
-        
         # Ensure we have a summary
         if not result['summary']:
             result['summary'] = self._generate_basic_summary(email)
@@ -181,22 +475,29 @@ Email to analyze:
         
         return result
     
-    def _rule_based_process_email(self, email: Dict) -> Dict:
+    def _rule_based_process_email(self, email: Dict, now: Optional[datetime] = None) -> Dict:
         """Process email using rule-based classification (fallback)"""
         
+        if now is None:
+            now = datetime.now()
+        
         subject = email.get('subject', '').lower()
         body = email.get('body', email.get('snippet', '')).lower()
-        timestamp = email.get('timestamp', datetime.now())
+        timestamp = email.get('timestamp', now)
         full_text = f"{subject} {body}"
         
+        # Single keyword scan shared by all classifiers; cached per text, so
+        # re-processing an inbox only recomputes the time-dependent urgency
+        found = _find_rule_keywords(full_text)
+        
         # Classify intent
-        intent = self._classify_intent(full_text)
+        intent = self._classify_intent(found)
         
         # Classify urgency
-        urgency = self._classify_urgency(full_text, timestamp)
+        urgency = self._classify_urgency(found, timestamp, now)
         
         # Classify sentiment
-        sentiment = self._classify_sentiment(full_text)
+        sentiment = self._classify_sentiment(found)
         
         # Generate summary
         summary = self._generate_basic_summary(email)
@@ -212,76 +513,41 @@ Email to analyze:
             'suggested_replies': suggested_replies
         }
     
-    def _classify_intent(self, text: str) -> str:
-        """Rule-based intent classification"""
-        
-        # Spam/Low Priority indicators
-        spam_keywords = ['winner', 'congratulations!!!', 'claim your prize', 
-                        'click here', 'limited time', 'act now', '$$$']
-        if any(keyword in text for keyword in spam_keywords):
-            return 'Spam/Low Priority'
-        
-        # Meeting Request indicators
-        meeting_keywords = ['meeting', 'schedule', 'calendar', 'availability',
-                          'call', 'conference', 'zoom', 'teams']
-        if any(keyword in text for keyword in meeting_keywords):
-            return 'Meeting Request'
-        
-        # Action Required indicators
-        action_keywords = ['urgent', 'asap', 'action required', 'please', 
-                          'need', 'must', 'required', 'approve', 'confirm']
-        if any(keyword in text for keyword in action_keywords):
-            return 'Action Required'
-        
-        # Follow-up indicators
-        followup_keywords = ['follow up', 'following up', 're:', 'regarding',
-                            'update', 'status', 'checking in']
-        if any(keyword in text for keyword in followup_keywords):
-            return 'Follow-up'
+    def _classify_intent(self, found: frozenset) -> str:
+        """Rule-based intent classification from the keywords found in an email"""
+        for intent, keywords in _INTENT_KEYWORDS:
+            if any(keyword in found for keyword in keywords):
+                return intent
         
         # Default to Informational
         return 'Informational'
     
-    def _classify_urgency(self, text: str, timestamp: datetime) -> str:
+    def _classify_urgency(self, found: frozenset, timestamp: datetime, now: datetime) -> str:
         """Rule-based urgency classification"""
         
-        # High urgency indicators
-        urgent_keywords = ['urgent', 'asap', 'immediately', 'critical',
-                          'emergency', 'today', 'deadline', 'must']
-        
         # Check if email is very recent (< 3 hours)
-        is_recent = (datetime.now() - timestamp) < timedelta(hours=3)
+        is_recent = timestamp > now - _RECENT_EMAIL_AGE
         
-        if any(keyword in text for keyword in urgent_keywords) or is_recent:
+        # High urgency indicators
+        if any(keyword in found for keyword in _HIGH_URGENCY_KEYWORDS) or is_recent:
             return 'High'
         
-        # Low urgency indicators
-        low_keywords = ['fyi', 'for your information', 'newsletter', 
-                       'update', 'digest', 'no action required']
-        
         # Check if email is old (> 48 hours)
-        is_old = (datetime.now() - timestamp) > timedelta(hours=48)
+        is_old = timestamp < now - _OLD_EMAIL_AGE
         
-        if any(keyword in text for keyword in low_keywords) or is_old:
+        # Low urgency indicators
+        if any(keyword in found for keyword in _LOW_URGENCY_KEYWORDS) or is_old:
             return 'Low'
         
         # Default to Medium
         return 'Medium'
     
-    def _classify_sentiment(self, text: str) -> str:
+    def _classify_sentiment(self, found: frozenset) -> str:
         """Rule-based sentiment classification"""
         
-        # Positive indicators
-        positive_keywords = ['thank', 'excellent', 'great', 'wonderful',
-                           'appreciate', 'impressed', 'congratulations',
-                           'happy', 'pleased', 'perfect']
-        positive_count = sum(1 for keyword in positive_keywords if keyword in text)
-        
-        # Negative indicators
-        negative_keywords = ['issue', 'problem', 'error', 'failed', 'wrong',
-                           'disappointed', 'concerned', 'urgent', 'critical',
-                           'complaint']
-        negative_count = sum(1 for keyword in negative_keywords if keyword in text)
+        # Positive and negative indicators
+        positive_count = sum(1 for keyword in _POSITIVE_KEYWORDS if keyword in found)
+        negative_count = sum(1 for keyword in _NEGATIVE_KEYWORDS if keyword in found)
         
         if positive_count > negative_count and positive_count > 0:
             return 'Positive'
@@ -293,81 +559,72 @@ Email to analyze:
     def _generate_basic_summary(self, email: Dict) -> str:
         """Generate a basic summary from email content"""
         
-        subject = email.get('subject', 'No Subject')
-        body = email.get('body', email.get('snippet', ''))
-        sender_name = email.get('sender_name', 'Unknown')
-        
-        # Extract first few sentences from body
-        sentences = re.split(r'[.!?]+', body)
-        key_sentences = [s.strip() for s in sentences[:3] if s.strip()]
-        
-        summary = f"{sender_name} sent an email regarding: {subject}. "
-        
-        if key_sentences:
-            summary += ' '.join(key_sentences[:2])
-            if len(summary) > 250:
-                summary = summary[:247] + '...'
-        
-        return summary
+        return _basic_summary(
+            email.get('subject', 'No Subject'),
+            email.get('body', email.get('snippet', '')),
+            email.get('sender_name', 'Unknown')
+        )
     
     def _generate_template_replies(self, intent: str) -> List[str]:
         """Generate template-based replies based on intent"""
-        
-        base_replies = [
-            Config.REPLY_TEMPLATES['acknowledged'],
-            Config.REPLY_TEMPLATES['thank_you']
-        ]
-        
-        if intent == 'Action Required':
-            base_replies = [
-                Config.REPLY_TEMPLATES['review'],
-                Config.REPLY_TEMPLATES['acknowledged'],
-                Config.REPLY_TEMPLATES['need_more_info']
-            ]
-        elif intent == 'Meeting Request':
-            base_replies = [
-                Config.REPLY_TEMPLATES['meeting_confirmed'],
-                "Let me check my calendar and get back to you.",
-                "Could we schedule this for next week instead?"
-            ]
-        elif intent == 'Follow-up':
-            base_replies = [
-                Config.REPLY_TEMPLATES['review'],
-                Config.REPLY_TEMPLATES['thank_you'],
-                "Thanks for the follow-up. I'll prioritize this."
-            ]
-        elif intent == 'Spam/Low Priority':
-            base_replies = [
-                Config.REPLY_TEMPLATES['not_relevant'],
-                "Please remove me from this mailing list.",
-                "Not interested, thank you."
-            ]
-        
-        return base_replies[:3]
+        # Copy so callers can't modify the shared templates
+        return list(_TEMPLATE_REPLIES.get(intent, _DEFAULT_TEMPLATE_REPLIES))
     
-    async def process_batch(self, emails: List[Dict]) -> List[Dict]:
+    async def process_batch(
+        self,
+        emails: List[Dict],
+        on_result: Optional[Callable[[int, Dict], None]] = None
+    ) -> List[Dict]:
         """
         Process multiple emails concurrently
         
+        With AI enabled, emails are sent in groups of
+        Config.AI_EMAILS_PER_REQUEST per request to save round-trips, and
+        obvious spam is left to the rule-based classifier.
+        
         Args:
             emails: List of email dictionaries
+            on_result: Optional callback invoked with (index, result) as each
+                email finishes, in completion order
             
         Returns:
             List of processed email results
         """
-        tasks = [self.process_email(email) for email in emails]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle any exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                print(f"Error processing email {i}: {result}")
-                # Use fallback
-                processed_results.append(
-                    self._rule_based_process_email(emails[i])
-                )
-            else:
-                processed_results.append(result)
+        # Bound in-flight AI requests so large batches don't trip rate limits
+        semaphore = asyncio.Semaphore(max(1, Config.MAX_CONCURRENT_AI_REQUESTS))
+        
+        # One reference time for rule-based urgency across the batch
+        now = datetime.now()
+        
+        # Group the indices of emails that need the AI; everything else runs alone
+        if self.use_ai:
+            spam = [_is_obvious_spam(email) for email in emails]
+            ai_indices = [i for i, is_spam in enumerate(spam) if not is_spam]
+            size = max(1, Config.AI_EMAILS_PER_REQUEST)
+            groups = [ai_indices[start:start + size] for start in range(0, len(ai_indices), size)]
+            groups += [[i] for i, is_spam in enumerate(spam) if is_spam]
+        else:
+            groups = [[i] for i in range(len(emails))]
+        
+        results = [None] * len(emails)
+        
+        async def process_group(indices: List[int]):
+            chunk = [emails[i] for i in indices]
+            async with semaphore:
+                try:
+                    if len(chunk) > 1:
+                        chunk_results = await self._ai_process_chunk(chunk, now)
+                    else:
+                        chunk_results = [await self.process_email(chunk[0], now)]
+                except Exception as e:
+                    print(f"Error processing emails {indices}: {e}")
+                    # Use fallback
+                    chunk_results = [self._rule_based_process_email(email, now) for email in chunk]
+            
+            for i, result in zip(indices, chunk_results):
+                results[i] = result
+                if on_result is not None:
+                    on_result(i, result)
         
-        return processed_results
+        await asyncio.gather(*(process_group(indices) for indices in groups))
+        return results
@@ -3,10 +3,20 @@ Gmail API Integration Module
 Handles read-only Gmail API access with fallback to mock data
 """
 
+import asyncio
+import html
 import pickle
+import re
 import os.path
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import base64
 from email.mime.text import MIMEText
 
@@ -26,13 +36,59 @@ except ImportError:
     build = None
     HttpError = Exception
 
+# Optional aiohttp import - only needed for concurrent message retries
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+# Optional SIMD base64 codec - only needed for faster body decoding
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+    pybase64 = None
+
 from config import Config
 from mock_data import MockEmailGenerator
+from records import Email
+
+
+# HTML-to-text conversion for bodies that only have an HTML part
+_HTML_HIDDEN_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str) -> datetime:
+    """Parse an email Date header (cached; bulk senders repeat the same values)"""
+    return parsedate_to_datetime(date_str)
 
 
 class GmailFetcher:
     """Fetch emails from Gmail API or mock data"""
     
+    # Gmail accepts up to 100 calls per batch HTTP request
+    BATCH_SIZE = 100
+    
+    # REST endpoint and parallelism for concurrent single-message fetches
+    MESSAGE_URL = 'https://gmail.googleapis.com/gmail/v1/users/me/messages/{}'
+    MAX_CONCURRENT_FETCHES = 10
+    
+    # Exponential backoff before each retry round for failed batch entries
+    RETRY_BASE_DELAY_SECONDS = 1.0
+    RETRY_MAX_DELAY_SECONDS = 16.0
+    
+    # Refresh the OAuth token in the background once it is this close to expiry
+    TOKEN_REFRESH_WINDOW = timedelta(minutes=5)
+    
+    # Label counts are reused for this long before asking Gmail again
+    COUNT_CACHE_SECONDS = 60
+    
     def __init__(self, use_mock: bool = None):
         """
         Initialize Gmail fetcher
@@ -48,6 +104,18 @@ class GmailFetcher:
             self.use_mock = use_mock if use_mock is not None else Config.USE_MOCK_DATA
         
         self.service = None
+        self.creds = None
+        
+        # Single-flight background token refresh
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refresh_future: Optional[Future] = None
+        
+        # Label -> (monotonic fetch time, count) for get_email_count
+        self._count_cache: Dict[str, tuple] = {}
+        
+        # Message ID -> parsed email from the latest listing
+        self._message_cache: Dict[str, Email] = {}
         
         if not self.use_mock:
             try:
@@ -59,12 +127,8 @@ class GmailFetcher:
     
     def _authenticate(self):
         """Authenticate with Gmail API using OAuth2"""
-        creds = None
-        
         # Load existing credentials
-        if os.path.exists(Config.GMAIL_TOKEN_PATH):
-            with open(Config.GMAIL_TOKEN_PATH, 'rb') as token:
-                creds = pickle.load(token)
+        creds = self._load_credentials()
         
         # Refresh or get new credentials
         if not creds or not creds.valid:
@@ -83,12 +147,68 @@ class GmailFetcher:
                 creds = flow.run_local_server(port=0)
             
             # Save credentials for future use
-            with open(Config.GMAIL_TOKEN_PATH, 'wb') as token:
-                pickle.dump(creds, token)
+            self._save_credentials(creds)
         
+        self.creds = creds
         self.service = build('gmail', 'v1', credentials=creds)
     
-    def fetch_emails(self, max_results: int = None, label: str = 'UNREAD') -> List[Dict]:
+    def _load_credentials(self):
+        """Load saved OAuth credentials, migrating a legacy pickled token to JSON"""
+        if os.path.exists(Config.GMAIL_TOKEN_PATH):
+            return Credentials.from_authorized_user_file(
+                Config.GMAIL_TOKEN_PATH,
+                Config.GMAIL_SCOPES
+            )
+        
+        if os.path.exists(Config.GMAIL_LEGACY_TOKEN_PATH):
+            with open(Config.GMAIL_LEGACY_TOKEN_PATH, 'rb') as token:
+                creds = pickle.load(token)
+            self._save_credentials(creds)
+            return creds
+        
+        return None
+    
+    def _save_credentials(self, creds):
+        """Persist OAuth credentials to the token file as JSON"""
+        with open(Config.GMAIL_TOKEN_PATH, 'w') as token:
+            token.write(creds.to_json())
+    
+    def _refresh_token_if_stale(self):
+        """
+        Refresh the OAuth token ahead of expiry on a background thread
+        
+        The current token keeps serving requests while the refresh runs;
+        only a token that is no longer valid waits for the refresh to finish.
+        """
+        creds = self.creds
+        if creds is None or not creds.refresh_token or creds.expiry is None:
+            return
+        
+        # google-auth keeps expiry as naive UTC
+        remaining = creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        with self._refresh_lock:
+            if self._refresh_future is None and remaining < self.TOKEN_REFRESH_WINDOW:
+                if self._refresh_executor is None:
+                    self._refresh_executor = ThreadPoolExecutor(max_workers=1)
+                self._refresh_future = self._refresh_executor.submit(self._refresh_credentials)
+            future = self._refresh_future
+        
+        if future is not None and not creds.valid:
+            future.result()
+    
+    def _refresh_credentials(self):
+        """Refresh and save the OAuth credentials (runs on the refresh thread)"""
+        try:
+            self.creds.refresh(Request())
+            self._save_credentials(self.creds)
+        except Exception as e:
+            print(f"Gmail token refresh failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refresh_future = None
+    
+    def fetch_emails(self, max_results: int = None, label: str = 'UNREAD') -> List[Email]:
         """
         Fetch emails from Gmail or mock data
         
@@ -97,7 +217,7 @@ class GmailFetcher:
             label: Gmail label filter (default: UNREAD)
             
         Returns:
-            List of email dictionaries
+            List of Email records (support dict-style access)
         """
         if max_results is None:
             max_results = Config.MAX_EMAILS_PER_BATCH
@@ -107,29 +227,30 @@ class GmailFetcher:
         else:
             return self._fetch_gmail_emails(max_results, label)
     
-    def _fetch_mock_emails(self, max_results: int) -> List[Dict]:
+    def _fetch_mock_emails(self, max_results: int) -> List[Email]:
         """Fetch mock email data"""
-        emails = MockEmailGenerator.get_mock_emails(max_results)
-        
         # Format for consistency with Gmail API structure
-        formatted_emails = []
-        for email in emails:
-            formatted_emails.append({
-                'id': email['id'],
-                'sender': email['sender'],
-                'sender_name': email['sender_name'],
-                'subject': email['subject'],
-                'body': email['body'],
-                'snippet': email['body'][:150],
-                'timestamp': email['timestamp'],
-                'labels': email.get('labels', ['UNREAD']),
-                'is_mock': True
-            })
-        
-        return formatted_emails
+        return [
+            Email(
+                id=email['id'],
+                sender=email['sender'],
+                sender_name=email['sender_name'],
+                subject=email['subject'],
+                body=email['body'],
+                snippet=email['body'][:150],
+                timestamp=email['timestamp'],
+                # Build the default list only when an email has no labels
+                labels=email['labels'] if 'labels' in email else ['UNREAD'],
+                is_mock=True
+            )
+            # Shuffled so the mock inbox order still varies between fetches
+            for email in MockEmailGenerator.get_mock_emails(max_results, shuffled=True)
+        ]
     
-    def _fetch_gmail_emails(self, max_results: int, label: str) -> List[Dict]:
+    def _fetch_gmail_emails(self, max_results: int, label: str) -> List[Email]:
         """Fetch emails from Gmail API"""
+        self._refresh_token_if_stale()
+        
         try:
             # Query for emails with specified label
             query = f'label:{label}'
@@ -145,19 +266,133 @@ class GmailFetcher:
                 print('No messages found.')
                 return []
             
-            emails = []
-            for message in messages:
-                email_data = self._get_email_details(message['id'])
-                if email_data:
-                    emails.append(email_data)
+            message_ids = [message['id'] for message in messages]
+            
+            # Message content never changes, so only newly listed IDs are downloaded
+            new_ids = [message_id for message_id in message_ids
+                       if message_id not in self._message_cache]
+            for email in self._get_email_details_batch(new_ids):
+                self._message_cache[email['id']] = email
             
-            return emails
+            # Keep just the current listing so messages that left the label are dropped
+            self._message_cache = {
+                message_id: self._message_cache[message_id]
+                for message_id in message_ids if message_id in self._message_cache
+            }
+            # Callers get copies (labels included) so their edits never reach the cache
+            return [replace(email, labels=list(email.labels)) for email in self._message_cache.values()]
             
         except HttpError as error:
             print(f'An error occurred: {error}')
             return []
     
-    def _get_email_details(self, message_id: str) -> Optional[Dict]:
+    def _get_email_details_batch(self, message_ids: List[str]) -> List[Email]:
+        """
+        Get detailed information for many emails using batch HTTP requests
+        
+        Args:
+            message_ids: Gmail message IDs, in the order to return them
+            
+        Returns:
+            List of Email records (messages that fail are skipped)
+        """
+        messages = {}
+        failed_ids = []
+        
+        def collect(request_id, response, exception):
+            if exception is not None:
+                failed_ids.append(request_id)
+            else:
+                messages[request_id] = response
+        
+        for start in range(0, len(message_ids), self.BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for message_id in message_ids[start:start + self.BATCH_SIZE]:
+                batch.add(
+                    self.service.users().messages().get(
+                        userId='me',
+                        id=message_id,
+                        format='full'
+                    ),
+                    request_id=message_id
+                )
+            try:
+                batch.execute()
+            except HttpError as error:
+                print(f'Batch request failed, fetching individually: {error}')
+                failed_ids.extend(
+                    message_id for message_id in message_ids[start:start + self.BATCH_SIZE]
+                    if message_id not in messages
+                )
+        
+        # Retry rate-limited or failed batch entries after a backoff, concurrently
+        # when aiohttp is installed, then one at a time for any still missing
+        retry_ids = [message_id for message_id in dict.fromkeys(failed_ids)
+                     if message_id not in messages]
+        attempt = 0
+        if retry_ids and AIOHTTP_AVAILABLE:
+            self._retry_backoff(attempt)
+            attempt += 1
+            messages.update(asyncio.run(self._fetch_messages_async(retry_ids)))
+            retry_ids = [message_id for message_id in retry_ids if message_id not in messages]
+        
+        # Anything still missing is fetched one at a time below
+        if retry_ids:
+            self._retry_backoff(attempt)
+        
+        emails = []
+        retry_ids = set(retry_ids)
+        for message_id in message_ids:
+            if message_id in messages:
+                email_data = self._parse_message(message_id, messages[message_id])
+            elif message_id in retry_ids:
+                email_data = self._get_email_details(message_id)
+            else:
+                email_data = None
+            if email_data:
+                emails.append(email_data)
+        
+        return emails
+    
+    def _retry_backoff(self, attempt: int):
+        """Sleep before a retry round, doubling per attempt with full jitter"""
+        delay = min(self.RETRY_MAX_DELAY_SECONDS, self.RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+        time.sleep(random.uniform(0, delay))
+    
+    async def _fetch_messages_async(self, message_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch Gmail message resources concurrently over the REST API
+        
+        Args:
+            message_ids: Gmail message IDs to fetch
+            
+        Returns:
+            Dictionary of message ID to message resource (failures are skipped)
+        """
+        self._refresh_token_if_stale()
+        
+        headers = {'Authorization': f'Bearer {self.creds.token}'}
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+        
+        async with aiohttp.ClientSession(headers=headers) as session:
+            async def fetch_one(message_id: str):
+                async with semaphore:
+                    try:
+                        async with session.get(
+                            self.MESSAGE_URL.format(message_id),
+                            params={'format': 'full'}
+                        ) as response:
+                            response.raise_for_status()
+                            return message_id, await response.json()
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                        print(f'Error fetching email {message_id}: {error}')
+                        return message_id, None
+            
+            results = await asyncio.gather(*(fetch_one(message_id) for message_id in message_ids))
+        
+        return {message_id: message for message_id, message in results if message is not None}
+    
+    def _get_email_details(self, message_id: str) -> Optional[Email]:
         """Get detailed information for a specific email"""
         try:
             message = self.service.users().messages().get(
@@ -166,80 +401,101 @@ class GmailFetcher:
                 format='full'
             ).execute()
             
-            headers = message['payload'].get('headers', [])
-            
-            # Extract key headers
-            subject = ''
-            sender = ''
-            date_str = ''
-            
-            for header in headers:
-                name = header['name'].lower()
-                if name == 'subject':
-                    subject = header['value']
-                elif name == 'from':
-                    sender = header['value']
-                elif name == 'date':
-                    date_str = header['value']
-            
-            # Extract email body
-            body = self._get_email_body(message['payload'])
-            snippet = message.get('snippet', '')
-            
-            # Parse timestamp
-            timestamp = self._parse_date(date_str) if date_str else datetime.now()
-            
-            # Extract sender email and name
-            sender_email, sender_name = self._parse_sender(sender)
-            
-            return {
-                'id': message_id,
-                'sender': sender_email,
-                'sender_name': sender_name,
-                'subject': subject,
-                'body': body,
-                'snippet': snippet,
-                'timestamp': timestamp,
-                'labels': message.get('labelIds', []),
-                'is_mock': False
-            }
+            return self._parse_message(message_id, message)
             
         except HttpError as error:
             print(f'Error fetching email {message_id}: {error}')
             return None
     
+    def _parse_message(self, message_id: str, message: Dict) -> Email:
+        """Convert a Gmail API message resource into an Email record"""
+        headers = message['payload'].get('headers', [])
+        
+        # Extract key headers (the last occurrence of a repeated header wins)
+        header_values = {header['name'].lower(): header['value'] for header in headers}
+        subject = header_values.get('subject', '')
+        sender = header_values.get('from', '')
+        date_str = header_values.get('date', '')
+        
+        # Extract email body
+        body = self._get_email_body(message['payload'])
+        snippet = message.get('snippet', '')
+        
+        # Parse timestamp
+        timestamp = self._parse_date(date_str) if date_str else datetime.now()
+        
+        # Extract sender email and name
+        sender_email, sender_name = self._parse_sender(sender)
+        
+        return Email(
+            id=message_id,
+            sender=sender_email,
+            sender_name=sender_name,
+            subject=subject,
+            body=body,
+            snippet=snippet,
+            timestamp=timestamp,
+            labels=message.get('labelIds', []),
+            is_mock=False
+        )
+    
     def _get_email_body(self, payload: Dict) -> str:
-        """Extract email body from payload"""
-        body = ''
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(
-                            part['body']['data']
-                        ).decode('utf-8')
-                        break
-                elif part['mimeType'] == 'text/html' and not body:
-                    if 'data' in part['body']:
-                        # Fallback to HTML if plain text not available
-                        body = base64.urlsafe_b64decode(
-                            part['body']['data']
-                        ).decode('utf-8')
-        else:
+        """Extract email body from payload, preferring plain text over HTML"""
+        if 'parts' not in payload:
+            body = ''
             if 'data' in payload.get('body', {}):
-                body = base64.urlsafe_b64decode(
-                    payload['body']['data']
-                ).decode('utf-8')
+                body = self._decode_body_data(payload['body']['data'])
+                if payload.get('mimeType') == 'text/html':
+                    body = self._html_to_text(body)
+            return body
         
-        return body
+        # Depth-first walk so parts nested in multipart/alternative or
+        # multipart/mixed are found; the first plain text part wins
+        html_data = None
+        stack = list(reversed(payload['parts']))
+        while stack:
+            part = stack.pop()
+            if 'parts' in part:
+                stack.extend(reversed(part['parts']))
+                continue
+            
+            data = part.get('body', {}).get('data')
+            if not data:
+                continue
+            if part.get('mimeType') == 'text/plain':
+                return self._decode_body_data(data)
+            if part.get('mimeType') == 'text/html' and html_data is None:
+                html_data = data
+        
+        # Fallback to HTML if plain text not available
+        if html_data is not None:
+            return self._html_to_text(self._decode_body_data(html_data))
+        return ''
+    
+    @staticmethod
+    def _html_to_text(html_body: str) -> str:
+        """Reduce an HTML body to its visible text"""
+        text = _HTML_TAG_RE.sub(' ', _HTML_HIDDEN_RE.sub(' ', html_body))
+        return _WHITESPACE_RE.sub(' ', html.unescape(text)).strip()
+    
+    @staticmethod
+    def _decode_body_data(data: str) -> str:
+        """Decode a base64url message body part to text"""
+        # Add any padding Gmail left off; malformed UTF-8 is replaced
+        # rather than failing the whole message
+        data += '=' * (-len(data) % 4)
+        codec = pybase64 if PYBASE64_AVAILABLE else base64
+        return codec.urlsafe_b64decode(data).decode('utf-8', errors='replace')
     
     def _parse_sender(self, sender_str: str) -> tuple:
         """Parse sender string into email and name"""
         # Format: "Name <email@domain.com>" or "email@domain.com"
-        if '<' in sender_str and '>' in sender_str:
-            name = sender_str.split('<')[0].strip().strip('"')
-            email = sender_str.split('<')[1].strip('>')
+        open_index = sender_str.find('<')
+        if open_index != -1 and '>' in sender_str:
+            # Slice around the angle brackets instead of splitting twice
+            next_open = sender_str.find('<', open_index + 1)
+            name = sender_str[:open_index].strip().strip('"')
+            email = sender_str[open_index + 1:next_open if next_open != -1 else None].strip('>')
         else:
             email = sender_str.strip()
             name = email.split('@')[0]
@@ -248,16 +504,19 @@ class GmailFetcher:
     
     def _parse_date(self, date_str: str) -> datetime:
         """Parse email date string to datetime"""
-        from email.utils import parsedate_to_datetime
         try:
-            return parsedate_to_datetime(date_str)
-        except:
+            return _parse_date_cached(date_str)
+        except (TypeError, ValueError):
             return datetime.now()
     
     def get_email_count(self, label: str = 'UNREAD') -> int:
         """Get count of emails with specified label"""
         if self.use_mock:
-            return len(MockEmailGenerator.get_mock_emails())
+            return len(MockEmailGenerator.SAMPLE_EMAILS)
+        
+        cached = self._count_cache.get(label)
+        if cached is not None and time.monotonic() - cached[0] < self.COUNT_CACHE_SECONDS:
+            return cached[1]
         
         try:
             results = self.service.users().messages().list(
@@ -266,6 +525,8 @@ class GmailFetcher:
                 maxResults=1
             ).execute()
             
-            return results.get('resultSizeEstimate', 0)
+            count = results.get('resultSizeEstimate', 0)
+            self._count_cache[label] = (time.monotonic(), count)
+            return count
         except:
             return 0
@@ -10,6 +10,7 @@ import random
 class MockEmailGenerator:
     """Generate realistic mock email data"""
     
+    # Email templates; 'age' is turned into a fresh timestamp on each fetch
     SAMPLE_EMAILS = [
         {
             'id': 'mock_001',
@@ -29,7 +30,7 @@ Key points to discuss:
 
 Thanks,
 John''',
-            'timestamp': datetime.now() - timedelta(hours=2),
+            'age': timedelta(hours=2),
             'labels': ['UNREAD', 'IMPORTANT']
         },
         {
@@ -50,7 +51,7 @@ Read more at our website.
 
 Best regards,
 Tech Insights Team''',
-            'timestamp': datetime.now() - timedelta(days=1),
+            'age': timedelta(days=1),
             'labels': ['UNREAD']
         },
         {
@@ -71,7 +72,7 @@ Looking forward to continuing our collaboration.
 
 Best,
 Sarah''',
-            'timestamp': datetime.now() - timedelta(hours=5),
+            'age': timedelta(hours=5),
             'labels': ['UNREAD', 'IMPORTANT']
         },
         {
@@ -91,7 +92,7 @@ This is to inform you about updates to our Paid Time Off policy effective Januar
 Full details are available on the employee portal. No action required at this time.
 
 HR Team''',
-            'timestamp': datetime.now() - timedelta(days=3),
+            'age': timedelta(days=3),
             'labels': ['UNREAD']
         },
         {
@@ -109,7 +110,7 @@ Please let me know what works best for you.
 
 Regards,
 Mike''',
-            'timestamp': datetime.now() - timedelta(hours=8),
+            'age': timedelta(hours=8),
             'labels': ['UNREAD']
         },
         {
@@ -130,7 +131,7 @@ Steps:
 Failure to comply may result in account suspension for security reasons.
 
 IT Security Team''',
-            'timestamp': datetime.now() - timedelta(minutes=30),
+            'age': timedelta(minutes=30),
             'labels': ['UNREAD', 'IMPORTANT']
         },
         {
@@ -152,7 +153,7 @@ This year's theme: Winter Wonderland
 RSVP by December 1st. Plus-one welcome!
 
 Event Team''',
-            'timestamp': datetime.now() - timedelta(days=5),
+            'age': timedelta(days=5),
             'labels': ['UNREAD']
         },
         {
@@ -169,7 +170,7 @@ CLICK HERE TO CLAIM YOUR PRIZE!!!
 This offer expires in 24 hours. Don't miss out on this amazing opportunity!
 
 *Terms and conditions apply. Must provide credit card for verification.''',
-            'timestamp': datetime.now() - timedelta(days=2),
+            'age': timedelta(days=2),
             'labels': ['UNREAD', 'SPAM']
         },
         {
@@ -187,7 +188,7 @@ Not urgent, but would appreciate guidance when you have a moment.
 
 Thanks!
 Emma''',
-            'timestamp': datetime.now() - timedelta(hours=12),
+            'age': timedelta(hours=12),
             'labels': ['UNREAD']
         },
         {
@@ -210,28 +211,44 @@ This is mandatory attendance. The meeting will be recorded for those traveling.
 We've accomplished great things this year and I'm excited to share our vision for the future.
 
 CEO''',
-            'timestamp': datetime.now() - timedelta(hours=3),
+            'age': timedelta(hours=3),
             'labels': ['UNREAD', 'IMPORTANT']
         }
     ]
     
     @classmethod
-    def get_mock_emails(cls, count: int = None) -> List[Dict]:
+    def get_mock_emails(cls, count: int = None, shuffled: bool = False) -> List[Dict]:
         """
         Get mock email data
         
         Args:
             count: Number of emails to return (None for all)
+            shuffled: Return a random selection in random order instead of
+                the first count emails
             
         Returns:
             List of mock email dictionaries
         """
-        emails = cls.SAMPLE_EMAILS.copy()
+        # Timestamps are computed per call so mock emails never go stale
+        now = datetime.now()
         
-        if count is not None:
-            emails = random.sample(emails, min(count, len(emails)))
+        if count is None:
+            count = len(cls.SAMPLE_EMAILS)
         
-        return emails
+        if shuffled:
+            templates = random.sample(cls.SAMPLE_EMAILS, min(count, len(cls.SAMPLE_EMAILS)))
+        else:
+            templates = cls.SAMPLE_EMAILS[:count]
+        
+        return [cls._make_email(template, now) for template in templates]
+    
+    @staticmethod
+    def _make_email(template: Dict, now: datetime) -> Dict:
+        """Build an email from a template, timestamped relative to now"""
+        email = dict(template)
+        email['timestamp'] = now - email.pop('age')
+        email['labels'] = list(template['labels'])
+        return email
     
     @classmethod
     def add_random_emails(cls, count: int = 5) -> List[Dict]:
@@ -0,0 +1,47 @@
+"""
+Email Record Types
+Compact slotted records for fetched emails, with dict-style field access
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+from datetime import datetime
+
+
+class RecordMapping:
+    """Mapping-style access to dataclass fields, so dict-based code keeps working"""
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Field value, or default for unknown keys"""
+        if key not in self.__dataclass_fields__:
+            return default
+        return getattr(self, key)
+
+
+@dataclass(slots=True)
+class Email(RecordMapping):
+    """Email fetched from Gmail or mock data"""
+    id: str
+    sender: str
+    sender_name: str
+    subject: str
+    body: str
+    snippet: str = ''
+    timestamp: Optional[datetime] = None
+    labels: List[str] = field(default_factory=list)
+    is_mock: bool = False
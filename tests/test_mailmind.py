@@ -43,6 +43,10 @@ def test_mock_data():
     try:
         from mock_data import MockEmailGenerator
         emails = MockEmailGenerator.get_mock_emails(5)
+        
+        # Each call hands out its own records, labels included
+        emails[0]['labels'].append('EDITED')
+        assert 'EDITED' not in MockEmailGenerator.get_mock_emails(1)[0]['labels']
         print(f"✓ Mock data generated: {len(emails)} emails")
         print(f"  - Sample subject: {emails[0]['subject']}")
         return True
@@ -58,6 +62,8 @@ def test_gmail_fetcher():
         from gmail_fetcher import GmailFetcher
         fetcher = GmailFetcher(use_mock=True)
         emails = fetcher.fetch_emails(max_results=3)
+        assert emails[0]['subject'] == emails[0].get('subject') == emails[0].subject
+        assert emails[0].get('missing', 'default') == 'default'
         print(f"✓ Gmail fetcher working: {len(emails)} emails fetched")
         return True
     except Exception as e:
@@ -123,6 +129,229 @@ def test_csv_export():
         return False
 
 
+def test_executive_summary():
+    """Test executive summary aggregation"""
+    print("\nTesting executive summary...")
+    try:
+        from advanced_features import EmailBatch, EmailInsightGenerator
+        
+        emails = [
+            {'urgency': 'High', 'intent': 'Action Required', 'body': 'Urgent: please review before the deadline.'},
+            {'urgency': 'Low', 'intent': 'Informational', 'body': 'Weekly newsletter.'}
+        ]
+        
+        summary = EmailInsightGenerator.generate_executive_summary(emails)
+        assert summary['high_priority_count'] == 1
+        assert summary['action_required_count'] == 1
+        assert summary['risk_score'] == 30
+        assert EmailInsightGenerator.generate_executive_summary(EmailBatch.from_emails(emails)) == summary
+        print("✓ Executive summary working")
+        print(f"  - Workload: {summary['workload_level']}")
+        return True
+    except Exception as e:
+        print(f"✗ Executive summary error: {e}")
+        return False
+
+
+def test_email_chains():
+    """Test email chain detection"""
+    print("\nTesting email chains...")
+    try:
+        from advanced_features import EmailInsightGenerator
+        
+        emails = [
+            {'subject': 'Q4 Budget'},
+            {'subject': 'Team Lunch'},
+            {'subject': 'RE: Q4 Budget'},
+            {'subject': 'Fwd: Q4 Budget Review'},
+            {'subject': 'Weekly Digest'}
+        ]
+        
+        chains = EmailInsightGenerator.detect_email_chains(emails)
+        assert len(chains) == 1
+        assert chains[0]['subject'] == 'Q4 Budget'
+        assert chains[0]['emails'] == [emails[0], emails[2], emails[3]]
+        
+        # Containment pairs each email with the first chain start it relates to;
+        # 'xyz' relates only to 'xyz a', which 'a' already claimed
+        loose = [{'subject': 'a'}, {'subject': 'xyz a'}, {'subject': 'xyz'}]
+        assert [chain['emails'] for chain in EmailInsightGenerator.detect_email_chains(loose)] == [loose[:2]]
+        print(f"✓ Email chains working: {len(chains)} chain detected")
+        return True
+    except Exception as e:
+        print(f"✗ Email chains error: {e}")
+        return False
+
+
+def test_analyze_email():
+    """Test combined per-email analysis"""
+    print("\nTesting per-email analysis...")
+    try:
+        import pickle
+        from advanced_features import EmailInsightGenerator, EmailPatternAnalyzer, SmartCategorizer
+        
+        email = {
+            'subject': 'Contract review',
+            'body': 'Dear team, please review and sign the $5,000 contract by 12/15/2024.',
+            'sender': 'team@company.com'
+        }
+        
+        analysis = EmailInsightGenerator.analyze_email(email)
+        assert analysis['pattern'] == EmailPatternAnalyzer.detect_communication_style(email)
+        assert analysis['entities'] == EmailPatternAnalyzer.extract_entities(email)
+        assert analysis['category'] == SmartCategorizer.detect_email_category(email)
+        assert analysis['relationship'] == SmartCategorizer.detect_sender_relationship(email)
+        
+        # Word boundaries are Unicode-aware whichever regex engine is installed
+        entities = EmailPatternAnalyzer.extract_entities({
+            'body': 'Moved from é12/12/2024 café10:30 to 12/20/2024 10:30 AM, see https://example.com/agenda'
+        })
+        assert entities['dates'] == ['12/20/2024']
+        assert entities['times'] == ['10:30 AM']
+        assert entities['urls'] == ['https://example.com/agenda']
+        
+        # Must be picklable to run in worker processes
+        assert pickle.loads(pickle.dumps(EmailInsightGenerator.analyze_email))(email) == analysis
+        print(f"✓ Per-email analysis working: {analysis['category']}")
+        return True
+    except Exception as e:
+        print(f"✗ Per-email analysis error: {e}")
+        return False
+
+
+def test_processed_email():
+    """Test processed email records"""
+    print("\nTesting processed email records...")
+    try:
+        from email_intelligence import ProcessedEmail
+        from csv_exporter import CSVExporter
+        
+        email = ProcessedEmail(
+            email_id='test_1',
+            sender='boss@company.com',
+            sender_name='Boss',
+            subject='Budget',
+            body='Please review the budget.',
+            urgency='High',
+            intent='Action Required'
+        )
+        
+        # Dict-style access used by analyzers and exporters
+        assert email['urgency'] == email.urgency == 'High'
+        assert email.get('labels') == []
+        assert email.get('missing', 'default') == 'default'
+        assert 'drafted_reply' in email and 'missing' not in email
+        email['drafted_reply'] = 'On it.'
+        assert email.drafted_reply == 'On it.'
+        
+        csv_data, _ = CSVExporter.export_to_csv([email])
+        assert 'On it.' in csv_data
+        print("✓ Processed email records working")
+        return True
+    except Exception as e:
+        print(f"✗ Processed email records error: {e}")
+        return False
+
+
+def test_rule_classification():
+    """Test rule-based classification of the mock inbox"""
+    print("\nTesting rule-based classification...")
+    try:
+        from datetime import timedelta
+        from email_intelligence import EmailIntelligence, _is_obvious_spam
+        from mock_data import MockEmailGenerator
+        intelligence = EmailIntelligence(api_key='')
+        
+        # (intent, urgency, sentiment) per mock email, processed a minute after arrival
+        expected = {
+            'mock_001': ('Meeting Request', 'High', 'Neutral'),
+            'mock_002': ('Meeting Request', 'Low', 'Neutral'),
+            'mock_003': ('Meeting Request', 'Low', 'Positive'),
+            'mock_004': ('Action Required', 'Low', 'Neutral'),
+            'mock_005': ('Meeting Request', 'Low', 'Neutral'),
+            'mock_006': ('Action Required', 'High', 'Negative'),
+            'mock_007': ('Informational', 'Low', 'Neutral'),
+            'mock_008': ('Spam/Low Priority', 'High', 'Positive'),
+            'mock_009': ('Action Required', 'High', 'Negative'),
+            'mock_010': ('Meeting Request', 'Medium', 'Positive'),
+        }
+        
+        now = datetime.now()
+        for template in MockEmailGenerator.SAMPLE_EMAILS:
+            email = dict(template, timestamp=now - template['age'] - timedelta(minutes=1))
+            result = intelligence._rule_based_process_email(email, now)
+            actual = (result['intent'], result['urgency'], result['sentiment'])
+            assert actual == expected[template['id']], (template['id'], actual)
+        
+        # Inflected keywords count; words that merely contain one do not
+        found = intelligence._rule_based_process_email(
+            {'subject': 'Updated timeline', 'body': 'Meetings urgently needed, problems and errors.'}, now
+        )
+        assert (found['intent'], found['urgency'], found['sentiment']) == ('Meeting Request', 'High', 'Negative')
+        plain = intelligence._rule_based_process_email(
+            {'subject': 'Lunch', 'body': 'Mustard or ketchup?', 'timestamp': now - timedelta(hours=10)}, now
+        )
+        assert plain['intent'] == 'Informational'
+        
+        # Obvious spam needs Gmail's label or several keywords, not one stray hit
+        assert not _is_obvious_spam({'subject': 'Join the design review', 'body': 'Click here to join the Zoom call.'})
+        assert not _is_obvious_spam({'subject': 'Q3 sales results', 'body': 'Our winner this quarter is the EMEA team.'})
+        assert _is_obvious_spam({'subject': 'Q3 sales results', 'body': '', 'labels': ['SPAM', 'INBOX']})
+        assert _is_obvious_spam({'subject': 'WINNER', 'body': 'Claim your prize, act now!'})
+        
+        print("✓ Rule-based classification working")
+        return True
+    except Exception as e:
+        print(f"✗ Rule-based classification error: {e}")
+        return False
+
+
+def test_ai_chunk_timeout():
+    """Test that an AI timeout only falls back for its own chunk"""
+    print("\nTesting AI chunk timeouts...")
+    from config import Config
+    size = Config.AI_EMAILS_PER_REQUEST
+    try:
+        import asyncio
+        from email_intelligence import EmailIntelligence
+        intelligence = EmailIntelligence(api_key='')
+        intelligence.use_ai = True
+        Config.AI_EMAILS_PER_REQUEST = 3
+        timeouts = []
+        
+        async def fake_completion(prompt, max_tokens, timeout=None):
+            timeouts.append(timeout)
+            if 'Slow thread' in prompt:
+                raise asyncio.TimeoutError()
+            return ''.join(
+                f"RESULT {i}:\nSUMMARY: AI summary\nINTENT: Follow-up\nURGENCY: Medium\nSENTIMENT: Neutral\n"
+                for i in range(1, prompt.count('\nEMAIL ') + 1)
+            )
+        intelligence._request_completion = fake_completion
+        
+        emails = [{
+            'id': f'chunk_{i}',
+            'sender': 'team@company.com',
+            'sender_name': 'Team',
+            'subject': 'Slow thread' if i < 3 else f'Topic {i}',
+            'body': 'Checking in on the plan.',
+            'timestamp': datetime.now()
+        } for i in range(6)]
+        results = asyncio.run(intelligence.process_batch(emails))
+        
+        # The chunk deadline scales with its size; only the slow chunk falls back
+        assert timeouts == [Config.AI_TIMEOUT_SECONDS * 3] * 2
+        assert all(result['summary'] != 'AI summary' for result in results[:3])
+        assert all(result['summary'] == 'AI summary' for result in results[3:])
+        print("✓ AI chunk timeouts isolated")
+        return True
+    except Exception as e:
+        print(f"✗ AI chunk timeout error: {e}")
+        return False
+    finally:
+        Config.AI_EMAILS_PER_REQUEST = size
+
+
 def run_all_tests():
     """Run all tests"""
     print("=" * 50)
@@ -135,7 +364,13 @@ def run_all_tests():
         test_mock_data,
         test_gmail_fetcher,
         test_email_intelligence,
-        test_csv_export
+        test_csv_export,
+        test_executive_summary,
+        test_email_chains,
+        test_analyze_email,
+        test_processed_email,
+        test_rule_classification,
+        test_ai_chunk_timeout
     ]
     
     results = []